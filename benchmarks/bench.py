@@ -0,0 +1,231 @@
+import argparse
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+from benchmarks.fixtures import FixtureTransport, generate
+from mopidy_orfradio.client import HttpClient, ORFClient
+from mopidy_orfradio.library import (
+    ORFLibraryProvider,
+    ORFLibraryUri,
+    ORFUris,
+    ORFUriType,
+)
+from mopidy_orfradio.playback import ORFPlaybackProvider
+
+
+class Environment:
+    """A library and playback provider on empty caches, served from fixtures."""
+
+    def __init__(self, payloads, cache_dir, latency=0):
+        self.transport = FixtureTransport(payloads, latency=latency)
+        self.client = ORFClient(
+            http_client=HttpClient(cache_dir=cache_dir, transport=self.transport)
+        )
+        backend = types.SimpleNamespace(
+            config={
+                "orfradio": {"stations": list(ORFUris.stations), "afterhours": False}
+            }
+        )
+        self.library = ORFLibraryProvider(backend, client=self.client)
+        self.playback = ORFPlaybackProvider(None, backend, client=self.client)
+
+    def close(self):
+        self.client.close()
+
+
+class Workload:
+    """The calls to benchmark, derived from the archive listings."""
+
+    def __init__(self, payloads, items, seed=0):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = Environment(payloads, cache_dir)
+            self.stations = list(ORFUris.stations)
+            self.days = [
+                (station, ref.uri.rsplit("/", 1)[1])
+                for station in self.stations
+                for ref in env.library.browse(f"{ORFUris.ROOT}:{station}")
+                if ref.type == "directory"
+            ]
+            self.shows = [
+                (station, day_id, show.id)
+                for station, day_id in self.days
+                for show in env.client.get_day(station, day_id)
+            ]
+            tracks = [
+                track.uri
+                for uri in random.Random(seed).sample(
+                    self.show_uris(), min(items, len(self.shows))
+                )
+                for track in env.library.lookup(uri)
+            ]
+            env.close()
+        sample = random.Random(seed).sample(tracks, min(items, len(tracks)))
+        self.item_uris = sample
+        # Item URIs as stored before they carried their stream:
+        self.legacy_item_uris = [uri.split("?")[0] for uri in sample]
+
+    def station_uris(self):
+        return [str(ORFLibraryUri(ORFUriType.STATION, s)) for s in self.stations]
+
+    def day_uris(self):
+        return [str(ORFLibraryUri(ORFUriType.ARCHIVE_DAY, *d)) for d in self.days]
+
+    def show_uris(self):
+        return [str(ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, *s)) for s in self.shows]
+
+    def calls(self, operation, env):
+        """The (function, args) pairs an operation consists of."""
+        return OPERATIONS[operation](self, env)
+
+
+# Functions building the calls of each operation from a workload and an
+# environment.
+OPERATIONS = {
+    "get_day": lambda w, env: [(env.client.get_day, day) for day in w.days],
+    "get_show": lambda w, env: [(env.client.get_show, show) for show in w.shows],
+    "browse station": lambda w, env: [
+        (env.library.browse, (uri,)) for uri in w.station_uris()
+    ],
+    "browse day": lambda w, env: [(env.library.browse, (uri,)) for uri in w.day_uris()],
+    "lookup show": lambda w, env: [
+        (env.library.lookup, (uri,)) for uri in w.show_uris()
+    ],
+    "lookup item": lambda w, env: [(env.library.lookup, (uri,)) for uri in w.item_uris],
+    "translate_uri": lambda w, env: [
+        (env.playback.translate_uri, (uri,)) for uri in w.item_uris
+    ],
+    "translate_uri legacy": lambda w, env: [
+        (env.playback.translate_uri, (uri,)) for uri in w.legacy_item_uris
+    ],
+}
+
+
+def measure(calls):
+    latencies = []
+    gc.collect()
+    start = time.perf_counter()
+    for function, args in calls:
+        t = time.perf_counter()
+        function(*args)
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "ops_per_s": len(latencies) / total if total else 0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0,
+    }
+
+
+def run(payloads, workload, latency):
+    """Time every operation on fresh caches, then again on warm ones."""
+    results = []
+    for operation in OPERATIONS:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = Environment(payloads, cache_dir, latency=latency)
+            calls = workload.calls(operation, env)
+            for cache in ("cold", "warm"):
+                requests = env.transport.requests
+                result = measure(calls)
+                result.update(
+                    operation=operation,
+                    cache=cache,
+                    requests=env.transport.requests - requests,
+                )
+                results.append(result)
+            env.close()
+    return results
+
+
+def peak_memory(payloads, workload):
+    """Memory used by loading all listings and records of the week."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        gc.collect()
+        tracemalloc.start()
+        env = Environment(payloads, cache_dir)
+        for station, day_id in workload.days:
+            env.library.lookup(
+                str(ORFLibraryUri(ORFUriType.ARCHIVE_DAY, station, day_id))
+            )
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        env.close()
+    return {"current_mib": current / 2**20, "peak_mib": peak / 2**20}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the ORF radio backend against a synthetic archive."
+    )
+    parser.add_argument("--days", type=int, default=8, help="archive days")
+    parser.add_argument("--items", type=int, default=1000, help="items to sample")
+    parser.add_argument(
+        "--latency", type=float, default=0, help="simulated request latency in ms"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write results to PATH")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    payloads = generate(days=args.days, seed=args.seed)
+    workload = Workload(payloads, items=args.items, seed=args.seed)
+    size = sum(map(len, payloads.values()))
+    print(
+        f"{len(workload.stations)} stations, {len(workload.days)} days, "
+        f"{len(workload.shows)} shows, {len(workload.item_uris)} sampled items, "
+        f"{len(payloads)} payloads ({size / 2**20:.1f} MiB), "
+        f"generated in {time.perf_counter() - start:.1f}s"
+    )
+
+    results = run(payloads, workload, latency=args.latency / 1000)
+    memory = peak_memory(payloads, workload)
+
+    header = [
+        "operation",
+        "cache",
+        "calls",
+        "requests",
+        "ops/s",
+        "p50",
+        "p95",
+        "p99",
+        "max",
+    ]
+    print(f"{header[0]:<22}{header[1]:<6}" + "".join(f"{h:>10}" for h in header[2:]))
+    for r in results:
+        print(
+            f"{r['operation']:<22}{r['cache']:<6}{r['calls']:>10}{r['requests']:>10}"
+            f"{r['ops_per_s']:>10.0f}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+            f"{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}"
+        )
+    print("Latencies in ms.")
+    print(
+        f"Memory after loading the week: {memory['current_mib']:.1f} MiB, "
+        f"peak {memory['peak_mib']:.1f} MiB"
+    )
+
+    if args.json:
+        with Path(args.json).open("w") as f:
+            json.dump(
+                {"args": vars(args), "results": results, "memory": memory}, f, indent=2
+            )
+
+
+def _percentile(values, q):
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import datetime as dt
+import json
+import random
+import time
+from email.message import Message
+
+from mopidy_orfradio import TZ
+from mopidy_orfradio.client import ORFClient
+from mopidy_orfradio.library import ORFUris
+from mopidy_orfradio.transport import HttpResponse
+
+# Show lengths in minutes, with their relative frequency in a day's program.
+SHOW_LENGTHS = {3: 6, 5: 4, 10: 3, 25: 4, 30: 3, 55: 5, 60: 4, 90: 2, 120: 2, 180: 1}
+
+ITEM_TYPES = ["M"] * 6 + ["B", "BJ", "N", "J", "W", "S"]
+
+WORDS = [
+    "Journal",
+    "Morgen",
+    "Mittag",
+    "Abend",
+    "Musik",
+    "Klassik",
+    "Jazz",
+    "Pop",
+    "Rock",
+    "Nachrichten",
+    "Wetter",
+    "Kultur",
+    "Wissen",
+    "Reportage",
+    "Interview",
+    "Konzert",
+    "Oper",
+    "Sinfonie",
+    "Radio",
+    "Kolleg",
+    "Punkt",
+    "Eins",
+    "Hörspiel",
+    "Matinee",
+    "Ambiente",
+    "Spielräume",
+    "Dimensionen",
+    "Salzburg",
+    "Wien",
+    "Tirol",
+    "Kärnten",
+    "Graz",
+    "Linz",
+    "Bregenz",
+    "Eisenstadt",
+    "Symphonie",
+]
+
+
+def generate(stations=None, days=8, today=None, seed=0):
+    """
+    Synthesize archive listings and broadcast records of a week of radio.
+
+    Returns a dict mapping API URLs to JSON payloads shaped like the ones
+    served by audioapi.orf.at. The same arguments give the same payloads.
+    """
+    rng = random.Random(seed)
+    stations = stations or list(ORFUris.stations)
+    today = today or dt.datetime.now(tz=TZ).date()
+    now = dt.datetime.now(tz=TZ)
+    payloads = {}
+    for station in stations:
+        day_recs = []
+        for d in reversed(range(days)):
+            date = today - dt.timedelta(days=d)
+            broadcasts, records = _day(rng, station, date, now)
+            day_recs.append(
+                {
+                    "day": int(date.strftime("%Y%m%d")),
+                    "date": _ms(_day_start(date)),
+                    "dateISO": _day_start(date).isoformat(),
+                    "dateOffset": -7200000,
+                    "broadcasts": broadcasts,
+                }
+            )
+            for program_key, record in records:
+                url = ORFClient.record_uri % (station, program_key, record["day"])
+                payloads[url] = json.dumps(record["rec"]).encode()
+        payloads[ORFClient.archive_uri % station] = json.dumps(day_recs).encode()
+    return payloads
+
+
+class FixtureTransport:
+    """Serves generated payloads in place of HttpTransport."""
+
+    def __init__(self, payloads, latency=0):
+        self.payloads = payloads
+        self.latency = latency
+        self.requests = 0
+
+    def get(self, url, headers=None):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        content = self.payloads.get(url)
+        message = Message()
+        message["Content-Type"] = "application/json; charset=utf-8"
+        if content is None:
+            return HttpResponse(404, message, b"")
+        etag = f'"{hash(content) & 0xFFFFFFFF:x}"'
+        message["ETag"] = etag
+        if headers and headers.get("If-None-Match") == etag:
+            return HttpResponse(304, message, b"")
+        return HttpResponse(200, message, content)
+
+    def close(self):
+        pass
+
+
+def _day(rng, station, date, now):
+    start = _day_start(date)
+    end = start + dt.timedelta(days=1)
+    broadcasts = []
+    records = []
+    while start < end:
+        minutes = rng.choices(list(SHOW_LENGTHS), weights=SHOW_LENGTHS.values())[0]
+        show_end = min(start + dt.timedelta(minutes=minutes), end)
+        program_key = str(100000 + len(broadcasts) * 37 + rng.randrange(37))
+        title = _title(rng)
+        broadcast = {
+            "programKey": program_key,
+            "title": title,
+            "subtitle": _text(rng, 0, 30),
+            "description": _text(rng, 0, 80),
+            "isPublic": True,
+            "isBroadcasted": start < now,
+            "start": _ms(start),
+            "scheduled": _ms(start),
+            "scheduledOffset": -7200000,
+            "startISO": start.isoformat(),
+            "scheduledISO": start.isoformat(),
+            "startOffset": -7200000,
+            "end": _ms(show_end),
+            "endISO": show_end.isoformat(),
+            "endOffset": -7200000,
+        }
+        broadcasts.append(broadcast)
+        records.append(
+            (
+                program_key,
+                {
+                    "day": date.strftime("%Y%m%d"),
+                    "rec": _record(
+                        rng, station, date, broadcast, start=start, end=show_end
+                    ),
+                },
+            )
+        )
+        start = show_end
+    return broadcasts, records
+
+
+def _record(rng, station, date, broadcast, *, start, end):  # noqa: PLR0913
+    length = end - start
+    if length <= dt.timedelta(minutes=5):
+        count = 1
+    elif rng.random() < 0.2:
+        count = 0
+    else:
+        count = rng.randint(2, max(2, int(length.total_seconds() // 200)))
+    # Items don't always start with the show, which adds a zeroth item.
+    item_start = start + dt.timedelta(seconds=rng.choice([0, 0, 0, 12]))
+    seconds = int((end - item_start).total_seconds())
+    offsets = sorted(rng.randrange(seconds) for _ in range(count))
+    starts = [item_start + dt.timedelta(seconds=offset) for offset in offsets]
+    if starts:
+        starts[0] = item_start
+    items = []
+    for i, s in enumerate(starts):
+        e = starts[i + 1] if i + 1 < len(starts) else end
+        item_type = rng.choice(ITEM_TYPES)
+        items.append(
+            {
+                "station": station,
+                "entity": "BroadcastItem",
+                "type": item_type,
+                "title": _title(rng) if rng.random() < 0.9 else None,
+                "interpreter": _title(rng) if item_type == "M" else None,
+                "description": _text(rng, 0, 20),
+                "isOnDemand": True,
+                "duration": _ms(e) - _ms(s),
+                "start": _ms(s),
+                "startISO": s.isoformat(),
+                "startOffset": -7200000,
+                "end": _ms(e),
+                "endISO": e.isoformat(),
+                "endOffset": -7200000,
+            }
+        )
+    # Long shows are split into several loop streams.
+    stream_starts = [start]
+    while stream_starts[-1] + dt.timedelta(hours=1) < end:
+        stream_starts.append(stream_starts[-1] + dt.timedelta(hours=1))
+    streams = [
+        {
+            "alias": f"7Days{date:%a}{i}",
+            "loopStreamId": f"{s:%Y-%m-%d_%H%M}_tl_51_7Days{date:%a}{i}_"
+            f"{rng.randrange(10**6)}.mp3",
+            "start": _ms(s),
+            "startISO": s.isoformat(),
+            "end": _ms(min(s + dt.timedelta(hours=1), end)),
+        }
+        for i, s in enumerate(stream_starts)
+    ]
+    return {
+        "station": station,
+        "entity": "Broadcast",
+        "broadcastDay": int(date.strftime("%Y%m%d")),
+        "programKey": broadcast["programKey"],
+        "title": broadcast["title"],
+        "subtitle": broadcast["subtitle"],
+        "description": broadcast["description"],
+        "moderator": _title(rng) if rng.random() < 0.5 else None,
+        "start": broadcast["start"],
+        "startISO": broadcast["startISO"],
+        "end": broadcast["end"],
+        "endISO": broadcast["endISO"],
+        "tags": [],
+        "items": items,
+        "streams": streams,
+    }
+
+
+def _day_start(date):
+    return dt.datetime.combine(date, dt.time(6), tzinfo=TZ)
+
+
+def _ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+def _title(rng):
+    return " ".join(rng.choices(WORDS, k=rng.randint(1, 4)))
+
+
+def _text(rng, low, high):
+    words = rng.randint(low, high)
+    return f"<p>{' '.join(rng.choices(WORDS, k=words))}</p>" if words else None
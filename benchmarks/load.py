@@ -0,0 +1,211 @@
+import argparse
+import collections
+import configparser
+import random
+import tempfile
+import threading
+import time
+
+from mopidy.models import Ref
+
+from benchmarks.fixtures import WORDS
+from benchmarks.server import add_arguments, from_arguments
+from mopidy_orfradio import Extension
+from mopidy_orfradio.backend import ORFBackend
+from mopidy_orfradio.library import ORFUris
+from mopidy_orfradio.metrics import METRICS
+
+ORF_API = "https://audioapi.orf.at"
+
+
+class StandInBackend(ORFBackend):
+    """An ORFBackend fetching from a stand-in server instead of the ORF API."""
+
+    def __init__(self, config, audio, api_url):
+        super().__init__(config, audio)
+        for name in ("archive_uri", "record_uri"):
+            template = getattr(self.client, name)
+            setattr(self.client, name, template.replace(ORF_API, api_url))
+
+
+class Session:
+    """
+    One simulated client, browsing to random shows and playing their items.
+
+    Calls go through the backend actor like Mopidy's core does, or straight
+    to the providers with ``direct``.
+    """
+
+    def __init__(self, backend, rng, stats, *, direct=False, think=0):
+        self.library = backend.library
+        self.playback = backend.playback
+        self.rng = rng
+        self.stats = stats
+        self.direct = direct
+        self.think = think
+
+    def run(self, deadline):
+        stations = [
+            slug for slug, (_, loopstream) in ORFUris.stations.items() if loopstream
+        ]
+        while time.monotonic() < deadline:
+            station = self.rng.choice(stations)
+            days = self.call("browse", self.library.browse, f"{ORFUris.ROOT}:{station}")
+            days = [ref for ref in days or () if ref.type == Ref.DIRECTORY]
+            if not days:
+                continue
+            shows = self.call("browse", self.library.browse, self.rng.choice(days).uri)
+            if not shows:
+                continue
+            tracks = self.call(
+                "lookup", self.library.lookup, self.rng.choice(shows).uri
+            )
+            if tracks:
+                track = self.rng.choice(tracks)
+                self.call("translate_uri", self.playback.translate_uri, track.uri)
+            if self.rng.random() < 0.1:
+                query = {"any": [self.rng.choice(WORDS)]}
+                self.call("search", self.library.search, query)
+
+    def call(self, operation, function, *args: object):
+        if self.think:
+            time.sleep(self.rng.uniform(0, 2 * self.think))
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+            if not self.direct:
+                result = result.get()
+        except Exception:  # noqa: BLE001
+            self.stats.record(operation, time.perf_counter() - start, failed=True)
+            return None
+        self.stats.record(operation, time.perf_counter() - start)
+        return result
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.failures = collections.Counter()
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, *, failed=False):
+        with self._lock:
+            self.latencies[operation].append(seconds)
+            if failed:
+                self.failures[operation] += 1
+
+
+def config(cache_dir, **overrides: str):
+    """The extension's default config, with a few values replaced."""
+    extension = Extension()
+    parser = configparser.RawConfigParser()
+    parser.read_string(extension.get_default_config())
+    values = dict(parser[extension.ext_name])
+    values.update(overrides)
+    ext_config, errors = extension.get_config_schema().deserialize(values)
+    if errors:
+        msg = f"Invalid config: {errors}"
+        raise ValueError(msg)
+    return {
+        "core": {"cache_dir": cache_dir},
+        "proxy": {},
+        extension.ext_name: ext_config,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive the ORF radio backend with many concurrent clients."
+    )
+    add_arguments(parser)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="in seconds")
+    parser.add_argument(
+        "--think", type=float, default=0, help="mean pause between calls in ms"
+    )
+    parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="call the providers directly instead of through the backend actor",
+    )
+    parser.add_argument(
+        "--prefetch-days", type=int, default=0, help="archive days to prefetch"
+    )
+    args = parser.parse_args(argv)
+
+    server = from_arguments(args)
+    server.start()
+    METRICS.reset()
+    stats = Stats()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        backend_config = config(
+            cache_dir,
+            prefetch_days=str(args.prefetch_days),
+            lookahead_tracks="0",
+            metrics_interval="0",
+        )
+        if args.direct:
+            backend = StandInBackend(backend_config, None, server.url)
+            backend.on_start()
+        else:
+            actor = StandInBackend.start(
+                config=backend_config, audio=None, api_url=server.url
+            )
+            backend = actor.proxy()
+        print(
+            f"Running {args.clients} clients for {args.duration:.0f}s against "
+            f"{server.url}"
+        )
+        deadline = time.monotonic() + args.duration
+        sessions = [
+            Session(
+                backend,
+                random.Random(args.seed + i),
+                stats,
+                direct=args.direct,
+                think=args.think / 1000,
+            )
+            for i in range(args.clients)
+        ]
+        threads = [
+            threading.Thread(target=session.run, args=(deadline,), daemon=True)
+            for session in sessions
+        ]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+        if args.direct:
+            backend.on_stop()
+        else:
+            actor.stop()
+    server.stop()
+
+    header = ["operation", "calls", "failed", "ops/s", "p50", "p95", "p99", "max"]
+    print(f"{header[0]:<16}" + "".join(f"{h:>10}" for h in header[1:]))
+    for operation, latencies in sorted(stats.latencies.items()):
+        latencies.sort()
+        print(
+            f"{operation:<16}{len(latencies):>10}{stats.failures[operation]:>10}"
+            f"{len(latencies) / elapsed:>10.1f}"
+            + "".join(
+                f"{_percentile(latencies, q) * 1000:>10.1f}" for q in (0.5, 0.95, 0.99)
+            )
+            + f"{latencies[-1] * 1000:>10.1f}"
+        )
+    print("Latencies in ms.")
+    print(
+        f"Server: {server.requests} requests, {server.errors} failed, "
+        f"{server.sent_bytes / 2**20:.1f} MiB sent"
+    )
+    print(f"Client: {METRICS.summary()}")
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+if __name__ == "__main__":
+    main()
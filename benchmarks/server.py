@@ -0,0 +1,192 @@
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import generate
+
+
+class StandInServer:
+    """
+    Serves archive listings and broadcast records in place of the ORF API.
+
+    Requests are answered after ``latency`` plus up to ``jitter`` seconds, and
+    a fraction ``error_rate`` of them fails with 503 Service Unavailable.
+    Every record is padded with ``padding`` bytes of description, to try
+    out larger payloads. Responses carry an ETag, and conditional requests
+    are answered with 304 Not Modified. Clients accepting gzip get it.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        payloads,
+        *,
+        host="127.0.0.1",
+        port=0,
+        latency=0,
+        jitter=0,
+        error_rate=0,
+        padding=0,
+        seed=0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.sent_bytes = 0
+        self._payloads = {
+            urllib.parse.urlsplit(url).path: _pad(content, padding)
+            for url, content in payloads.items()
+        }
+        self._etags = {
+            path: f'"{i:x}-{len(content)}"'
+            for i, (path, content) in enumerate(self._payloads.items())
+        }
+        self._compressed = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="StandInServer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, path, etag, accept_encoding=None):
+        """Return the status, headers and body of the response to a request."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {}, b""
+        content = self._payloads.get(path)
+        if content is None:
+            return HTTPStatus.NOT_FOUND, {}, b""
+        headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "ETag": self._etags[path],
+        }
+        if etag == self._etags[path]:
+            return HTTPStatus.NOT_MODIFIED, headers, b""
+        if "gzip" in (accept_encoding or ""):
+            headers["Content-Encoding"] = "gzip"
+            content = self._gzip(path)
+        with self._lock:
+            self.sent_bytes += len(content)
+        return HTTPStatus.OK, headers, content
+
+    def _gzip(self, path):
+        content = self._compressed.get(path)
+        if content is None:
+            content = self._compressed[path] = gzip.compress(self._payloads[path])
+        return content
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status, headers, body = self.server.stand_in.respond(
+            urllib.parse.urlsplit(self.path).path,
+            self.headers.get("If-None-Match"),
+            self.headers.get("Accept-Encoding"),
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def _pad(content, padding):
+    if not padding:
+        return content
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data["description"] = "x" * padding
+    return json.dumps(data).encode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve a synthetic ORF radio archive in place of the ORF API."
+    )
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    server = from_arguments(args, host=args.host, port=args.port)
+    print(f"Serving {args.days} archive days at {server.url}, press Ctrl-C to stop")
+    server.start()
+    try:
+        while True:
+            time.sleep(60)
+            print(
+                f"{server.requests} requests, {server.errors} failed, "
+                f"{server.sent_bytes / 2**20:.1f} MiB sent"
+            )
+    except KeyboardInterrupt:
+        server.stop()
+
+
+def add_arguments(parser):
+    """Add the options of the stand-in server to an argument parser."""
+    parser.add_argument("--days", type=int, default=8, help="archive days")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="response latency in ms"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0, help="random extra latency in ms"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="fraction of requests failing"
+    )
+    parser.add_argument(
+        "--padding", type=int, default=0, help="bytes added to every record"
+    )
+
+
+def from_arguments(args, **kwargs: object):
+    return StandInServer(
+        generate(days=args.days, seed=args.seed),
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        padding=args.padding,
+        seed=args.seed,
+        **kwargs,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -23,9 +23,29 @@ class Extension(ext.Extension):
         schema["afterhours"] = config.Boolean()
         schema["archive_types"] = config.List()
         schema["livestream_bitrate"] = config.Integer(choices=[128, 192])
+        schema["cache_max_stale"] = config.Integer(minimum=0)
+        schema["cache_max_size"] = config.Integer(minimum=0)
+        schema["shared_cache"] = config.Path(optional=True)
+        schema["prefetch"] = config.Boolean()
+        schema["prefetch_days"] = config.Integer(minimum=0, maximum=8)
+        schema["prefetch_workers"] = config.Integer(minimum=1)
+        schema["metrics_interval"] = config.Integer(minimum=0)
+        schema["lookahead_tracks"] = config.Integer(minimum=0)
+        schema["lookahead_workers"] = config.Integer(minimum=1)
+        schema["live_metadata"] = config.Boolean()
+        schema["audio_cache_size"] = config.Integer(minimum=0)
+        schema["audio_cache_days"] = config.Integer(minimum=1)
         return schema
 
     def setup(self, registry) -> None:
         from mopidy_orfradio.backend import ORFBackend  # noqa: PLC0415
+        from mopidy_orfradio.frontend import (  # noqa: PLC0415
+            ORFLiveFrontend,
+            ORFLookaheadFrontend,
+        )
+        from mopidy_orfradio.web import factory  # noqa: PLC0415
 
         registry.add("backend", ORFBackend)
+        registry.add("frontend", ORFLookaheadFrontend)
+        registry.add("frontend", ORFLiveFrontend)
+        registry.add("http:app", {"name": self.ext_name, "factory": factory})
@@ -1,10 +1,15 @@
 import logging
 
 import pykka
-from mopidy import backend
+from mopidy import backend, httpclient
 
-from mopidy_orfradio.library import ORFLibraryProvider
+from mopidy_orfradio import Extension, __version__
+from mopidy_orfradio.client import ORFClient
+from mopidy_orfradio.library import ORFLibraryProvider, ORFUris
+from mopidy_orfradio.metrics import METRICS, MetricsLogger
 from mopidy_orfradio.playback import ORFPlaybackProvider
+from mopidy_orfradio.prefetch import Lookahead, Prefetcher
+from mopidy_orfradio.segments import SegmentCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +19,79 @@ class ORFBackend(pykka.ThreadingActor, backend.Backend):
         super().__init__()
 
         self.config = config
+        ext_config = config["orfradio"]
 
-        self.library = ORFLibraryProvider(backend=self)
-        self.playback = ORFPlaybackProvider(audio=audio, backend=self)
+        self.segments = None
+        if ext_config["audio_cache_size"]:
+            self.segments = SegmentCache(
+                Extension.get_cache_dir(config) / "audio",
+                max_size=ext_config["audio_cache_size"] * 2**20,
+                max_age=ext_config["audio_cache_days"] * 24 * 60 * 60,
+                proxy=httpclient.format_proxy(config["proxy"]),
+                user_agent=httpclient.format_user_agent(
+                    f"{Extension.dist_name}/{__version__}"
+                ),
+            )
+
+        # Library and playback share one client, and thereby its caches and
+        # its pool of keep-alive connections.
+        self.client = ORFClient(backend=self)
+        self.library = ORFLibraryProvider(backend=self, client=self.client)
+        self.playback = ORFPlaybackProvider(
+            audio=audio, backend=self, client=self.client, segments=self.segments
+        )
         self.uri_schemes = ["orfradio"]
+
+        # Loads the archive listings, so that searching finds the shows of
+        # all days, even those not browsed yet.
+        self.prefetcher = None
+        if ext_config["prefetch"]:
+            self.prefetcher = Prefetcher(
+                self.client,
+                # Only stations with a loopstream slug have an archive:
+                stations=[
+                    slug
+                    for slug in ext_config["stations"]
+                    if ORFUris.stations.get(slug, (None, None))[1]
+                ],
+                days=ext_config["prefetch_days"],
+                workers=ext_config["prefetch_workers"],
+            )
+
+        self.metrics_logger = None
+        if ext_config["metrics_interval"]:
+            self.metrics_logger = MetricsLogger(
+                METRICS, interval=ext_config["metrics_interval"]
+            )
+
+        self.lookahead = None
+        if ext_config["lookahead_tracks"]:
+            self.lookahead = Lookahead(
+                self.client,
+                workers=ext_config["lookahead_workers"],
+                segments=self.segments,
+            )
+
+    def preresolve(self, uris):
+        """Resolve the playback URLs of tracks that are about to be played."""
+        if self.lookahead:
+            self.lookahead.submit(uris)
+
+    def get_on_air(self, station):
+        """The show a station is airing, see :meth:`ORFClient.get_on_air`."""
+        return self.client.get_on_air(station)
+
+    def on_start(self):
+        if self.prefetcher:
+            self.prefetcher.start()
+        if self.metrics_logger:
+            self.metrics_logger.start()
+
+    def on_stop(self):
+        if self.prefetcher:
+            self.prefetcher.stop()
+        if self.lookahead:
+            self.lookahead.stop()
+        if self.metrics_logger:
+            self.metrics_logger.stop()
+        self.client.close()
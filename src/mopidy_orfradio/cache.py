@@ -0,0 +1,433 @@
+import collections
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from mopidy_orfradio.transport import decompress
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    def __init__(  # noqa: PLR0913
+        self,
+        url,
+        content,
+        *,
+        encoding="utf-8",
+        content_encoding=None,
+        etag=None,
+        last_modified=None,
+        fetched=None,
+    ):
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        # The body is kept as received, possibly compressed.
+        self.content_encoding = content_encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched = time.time() if fetched is None else fetched
+
+    @property
+    def age(self):
+        return time.time() - self.fetched
+
+    @property
+    def text(self):
+        return decompress(self.content, self.content_encoding).decode(self.encoding)
+
+    def validators(self):
+        """Headers turning a request for this entry into a conditional GET."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class MemoryCache:
+    """
+    In-process cache with a lifetime per entry.
+
+    A lifetime of ``None`` keeps the entry until it is invalidated. Expired
+    entries are kept for another ``max_stale`` seconds, during which they
+    can still be looked up with :meth:`peek`.
+
+    If ``max_size`` is given, the least recently used entries are dropped
+    whenever the sizes given to :meth:`set` add up to more than that. Entries
+    whose key ``keep`` returns true for are only dropped when there is
+    nothing else left.
+    """
+
+    def __init__(self, max_stale=0, max_size=None, keep=None):
+        self.max_stale = max_stale
+        self.max_size = max_size
+        self.keep = keep
+        self.size = 0
+        # Values, expiry times and sizes, least recently used first.
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        value, fresh = self.peek(key, default)
+        return value if fresh else default
+
+    def peek(self, key, default=None):
+        """Return the value of a key, and whether it has not expired yet."""
+        with self._lock:
+            if key not in self._entries:
+                return default, False
+            value, expires, _ = self._entries[key]
+            fresh = True
+            if expires is not None:
+                now = time.monotonic()
+                if expires + self.max_stale <= now:
+                    self._remove(key)
+                    return default, False
+                fresh = now < expires
+            self._entries.move_to_end(key)
+            return value, fresh
+
+    def set(self, key, value, ttl=None, size=0):
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires, size)
+            self.size += size
+            self._evict()
+
+    def invalidate(self, predicate=None):
+        """Drop all entries, or only those whose key matches the predicate."""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                self.size = 0
+                return
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def _evict(self):
+        if self.max_size is None or self.size <= self.max_size:
+            return
+        keep = self.keep or (lambda _key: False)
+        # Least recently used first, those to keep after all others.
+        for key in sorted(self._entries, key=lambda key: bool(keep(key))):
+            self._remove(key)
+            logger.debug(f"Evicted {key!r} from the memory cache")
+            if self.size <= self.max_size:
+                return
+
+
+def sizeof(value):
+    """
+    Estimate the memory taken by a value and all objects it refers to.
+
+    Objects referred to more than once are counted once. Objects shared with
+    other values, like interned strings, are counted for each value.
+    """
+    size = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            stack.extend(_attributes(obj))
+    return size
+
+
+def _attributes(obj):
+    if hasattr(obj, "__dict__"):
+        yield obj.__dict__
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for name in [slots] if isinstance(slots, str) else slots:
+            if name != "__dict__" and hasattr(obj, name):
+                yield getattr(obj, name)
+
+
+class DiskCache:
+    """
+    Persistent store of HTTP response bodies and their validators.
+
+    Each entry is a single file: one line of JSON metadata followed by the raw
+    response body, compressed if it was sent that way. The file's modification
+    time records when the entry was last fetched or validated, its access time
+    when it was last used. Files are replaced atomically, so concurrent writers
+    never leave a truncated entry behind.
+
+    Entries not used for ``max_age`` seconds are deleted, by :meth:`set` at
+    most once every ``prune_interval`` seconds.
+    """
+
+    prune_interval = 60 * 60
+
+    def __init__(self, path, max_age=7 * 24 * 60 * 60):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        # The URLs of the entries by file name, read once when first needed.
+        self._urls = None
+        self._next_prune = 0
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        path = self._path(url)
+        try:
+            with path.open("rb") as f:
+                meta = json.loads(f.readline())
+                content = f.read()
+                fetched = os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Ignoring unreadable cache entry for {url!r}: {exc}")
+            return None
+        if meta.get("url") != url:
+            return None
+        self._utime(url, fetched)
+        return CacheEntry(
+            url,
+            content,
+            encoding=meta["encoding"],
+            content_encoding=meta.get("content_encoding"),
+            etag=meta["etag"],
+            last_modified=meta["last_modified"],
+            fetched=fetched,
+        )
+
+    def set(self, entry):
+        meta = {
+            "url": entry.url,
+            "encoding": entry.encoding,
+            "content_encoding": entry.content_encoding,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+        path = self._path(entry.url)
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode() + b"\n")
+                f.write(entry.content)
+            os.utime(tmp_name, (time.time(), entry.fetched))
+            Path(tmp_name).replace(path)
+        except OSError as exc:
+            logger.warning(f"Failed to write cache entry for {entry.url!r}: {exc}")
+            return
+        with self._lock:
+            if self._urls is not None:
+                self._urls[path.name] = entry.url
+        if time.monotonic() >= self._next_prune:
+            self._next_prune = time.monotonic() + self.prune_interval
+            self.prune()
+
+    def touch(self, entry):
+        """Mark an entry as freshly validated, e.g. after a 304 response."""
+        entry.fetched = time.time()
+        self._utime(entry.url, entry.fetched)
+
+    def expire(self, predicate=None):
+        """
+        Mark entries as stale, so they are revalidated before their next use.
+
+        Their bodies and validators are kept, so revalidating an unchanged
+        entry still only costs a 304 response.
+        """
+        for url in self.urls():
+            if predicate is None or predicate(url):
+                self._utime(url, 0)
+
+    def urls(self):
+        with self._lock:
+            if self._urls is None:
+                self._urls = dict(self._read_urls())
+            return list(self._urls.values())
+
+    def prune(self):
+        """Delete the entries not used for ``max_age`` seconds."""
+        deadline = time.time() - self.max_age
+        pruned = 0
+        for path in self.path.iterdir():
+            try:
+                if path.stat().st_atime >= deadline:
+                    continue
+                path.unlink()
+            except OSError:
+                continue
+            pruned += 1
+            with self._lock:
+                if self._urls is not None:
+                    self._urls.pop(path.name, None)
+        if pruned:
+            logger.debug(f"Pruned {pruned} unused entries from the disk cache")
+
+    def close(self):
+        """Nothing to release, each entry is written when it is set."""
+
+    def _read_urls(self):
+        for path in self.path.iterdir():
+            if path.suffix == ".tmp":
+                continue
+            try:
+                with path.open("rb") as f:
+                    yield path.name, json.loads(f.readline())["url"]
+            except (OSError, ValueError, KeyError):
+                continue
+
+    def _utime(self, url, fetched):
+        # Setting the modification time also marks the entry as used.
+        try:
+            os.utime(self._path(url), (time.time(), fetched))
+        except OSError as exc:
+            logger.debug(f"Failed to update cache entry for {url!r}: {exc}")
+
+    def _path(self, url):
+        return self.path / hashlib.sha1(url.encode()).hexdigest()  # noqa: S324
+
+
+class SqliteCache:
+    """
+    Store of HTTP response bodies and their validators in an SQLite database.
+
+    Works like :class:`DiskCache`, but one database file can be shared by
+    several processes, e.g. Mopidy instances for different rooms, so a
+    response fetched by one of them is there for all. SQLite does the
+    locking between processes.
+    """
+
+    prune_interval = DiskCache.prune_interval
+
+    def __init__(self, path, timeout=10, max_age=7 * 24 * 60 * 60):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self._next_prune = 0
+        # Statements run in autocommit mode, each in its own transaction.
+        self._conn = sqlite3.connect(
+            self.path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            # Let readers go on while another process writes.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, content BLOB NOT NULL, encoding TEXT NOT NULL, "
+                "content_encoding TEXT, etag TEXT, last_modified TEXT, "
+                "fetched REAL NOT NULL, used REAL NOT NULL)"
+            )
+
+    def get(self, url):
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT content, encoding, content_encoding, etag, "
+                    "last_modified, fetched FROM responses WHERE url = ?",
+                    (url,),
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning(f"Failed to read cache entry for {url!r}: {exc}")
+            return None
+        if row is None:
+            return None
+        self._execute("UPDATE responses SET used = ? WHERE url = ?", (time.time(), url))
+        content, encoding, content_encoding, etag, last_modified, fetched = row
+        return CacheEntry(
+            url,
+            content,
+            encoding=encoding,
+            content_encoding=content_encoding,
+            etag=etag,
+            last_modified=last_modified,
+            fetched=fetched,
+        )
+
+    def set(self, entry):
+        self._execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry.url,
+                entry.content,
+                entry.encoding,
+                entry.content_encoding,
+                entry.etag,
+                entry.last_modified,
+                entry.fetched,
+                time.time(),
+            ),
+        )
+        if time.monotonic() >= self._next_prune:
+            self._next_prune = time.monotonic() + self.prune_interval
+            self.prune()
+
+    def touch(self, entry):
+        """Mark an entry as freshly validated, e.g. after a 304 response."""
+        entry.fetched = time.time()
+        self._execute(
+            "UPDATE responses SET fetched = ?, used = ? WHERE url = ?",
+            (entry.fetched, entry.fetched, entry.url),
+        )
+
+    def expire(self, predicate=None):
+        """
+        Mark entries as stale, so they are revalidated before their next use.
+
+        Their bodies and validators are kept, so revalidating an unchanged
+        entry still only costs a 304 response.
+        """
+        if predicate is None:
+            self._execute("UPDATE responses SET fetched = 0", ())
+            return
+        for url in self.urls():
+            if predicate(url):
+                self._execute("UPDATE responses SET fetched = 0 WHERE url = ?", (url,))
+
+    def urls(self):
+        try:
+            with self._lock:
+                rows = self._conn.execute("SELECT url FROM responses").fetchall()
+        except sqlite3.Error as exc:
+            logger.warning(f"Failed to list cache entries: {exc}")
+            return
+        for (url,) in rows:
+            yield url
+
+    def prune(self):
+        """Delete the entries not used for ``max_age`` seconds."""
+        self._execute(
+            "DELETE FROM responses WHERE used < ?", (time.time() - self.max_age,)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql, parameters):
+        try:
+            with self._lock:
+                self._conn.execute(sql, parameters)
+        except sqlite3.Error as exc:
+            logger.warning(f"Failed to update the cache database: {exc}")
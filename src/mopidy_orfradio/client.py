@@ -1,40 +1,259 @@
+import bisect
+import concurrent.futures
+import dataclasses
 import datetime as dt
+import enum
+import functools
 import json
 import logging
 import re
-import urllib
-from typing import ClassVar
+import sys
+import threading
+import urllib.parse
+from http import HTTPStatus
+from typing import TYPE_CHECKING, ClassVar, cast
 
 import dateutil.parser
-from beaker.cache import CacheManager
-from beaker.util import parse_cache_config_options
-
-from mopidy_orfradio import TZ
+from mopidy import httpclient
+
+from mopidy_orfradio import TZ, Extension, __version__
+from mopidy_orfradio.cache import (
+    CacheEntry,
+    DiskCache,
+    MemoryCache,
+    SqliteCache,
+    sizeof,
+)
+from mopidy_orfradio.metrics import METRICS
+from mopidy_orfradio.transport import CircuitOpenError, HttpTransport, is_transient
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 logger = logging.getLogger(__name__)
 
 
-class HttpClient:
-    cache_opts: ClassVar[dict[str, str]] = {"cache.type": "memory"}
+class _Missing(enum.Enum):
+    MISSING = enum.auto()
+
+
+# Tells a missing cache entry from a cached None.
+_MISSING = _Missing.MISSING
 
-    cache = CacheManager(**parse_cache_config_options(cache_opts))
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class HttpClient:
+    expire = 300
+    # Lifetime of cached misses, and of last known good copies served while
+    # the server is failing, in seconds.
+    negative_ttl = 60
+    # Number of stale values refetched concurrently in the background.
+    revalidate_workers = 2
+
+    def __init__(
+        self,
+        cache_dir=None,
+        transport=None,
+        max_stale=0,
+        max_size=None,
+        disk_cache=None,
+    ):
+        self.cache = MemoryCache(
+            max_stale=max_stale, max_size=max_size, keep=self._keep
+        )
+        # Tells which URLs to keep in memory longest, if set.
+        self.keep: Callable[[str], bool] | None = None
+        # A DiskCache or SqliteCache, or None to only cache in memory.
+        if disk_cache is None and cache_dir:
+            disk_cache = DiskCache(cache_dir)
+        self.disk_cache = disk_cache
+        self.transport = transport or HttpTransport()
+        # Futures of the fetches currently in progress, by URL.
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._revalidator = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.revalidate_workers, thread_name_prefix="ORFRevalidate"
+        )
 
-    @cache.cache("get", expire=300)
-    def get(self, url):
+    def get(self, url, ttl=expire, parse=None, endpoint="other"):
+        """
+        Fetch the content of a URL, caching it for ``ttl`` seconds.
+
+        If given, ``parse`` turns the fetched text into the value that is
+        returned and cached, so it runs only once per fetched payload. It
+        must be the same for all calls with the same URL.
+
+        Concurrent calls for a URL that is not cached share a single fetch:
+        the first caller does the work, the others wait for its result.
+        A value that expired less than ``max_stale`` seconds ago is returned
+        right away while it is refetched in the background.
+
+        ``endpoint`` labels the metrics recorded for the URL.
+
+        The memory cache is bounded by the estimated size of the returned
+        values, see :func:`~mopidy_orfradio.cache.sizeof`.
+        """
+        stale, fresh = self.cache.peek(url, _MISSING)
+        if fresh and stale is not _MISSING:
+            METRICS.count("cache_requests", endpoint=endpoint, result="hit")
+            return stale
+        with self._lock:
+            # The value may have been cached since we last looked.
+            value, fresh = self.cache.peek(url, _MISSING)
+            if fresh and value is not _MISSING:
+                METRICS.count("cache_requests", endpoint=endpoint, result="hit")
+                return value
+            future = self._pending.get(url)
+            pending = future is not None
+            if future is None:
+                future = self._pending[url] = concurrent.futures.Future()
+        if pending:
+            if stale is not _MISSING:
+                METRICS.count("cache_requests", endpoint=endpoint, result="stale")
+                return stale
+            logger.debug(f"Waiting for pending fetch of {url!r}")
+            METRICS.count("cache_requests", endpoint=endpoint, result="coalesced")
+            return future.result()
+        if stale is not _MISSING:
+            logger.debug(f"Serving stale copy of {url!r} while refetching it")
+            METRICS.count("cache_requests", endpoint=endpoint, result="stale")
+            try:
+                self._revalidator.submit(
+                    self._complete, future, url, ttl, parse, endpoint, keep_stale=True
+                )
+            except RuntimeError:
+                # Closed, so nothing is refetched any more.
+                with self._lock:
+                    del self._pending[url]
+                future.set_result(stale)
+            return stale
+        METRICS.count("cache_requests", endpoint=endpoint, result="miss")
+        return self._complete(future, url, ttl, parse, endpoint)
+
+    def _complete(self, future, url, ttl, parse, endpoint, *, keep_stale=False):  # noqa: PLR0913
+        try:
+            value, ttl, size = self._load(url, ttl, parse, endpoint)
+        except BaseException as exc:
+            future.set_exception(exc)
+            if not keep_stale:
+                raise
+            # Nobody waits for a refetch in the background, so report here.
+            logger.exception(f"Error refetching {url!r}")
+            return None
+        else:
+            # Transient failures are not cached, so a stale value stays in
+            # place and is served until it is too old.
+            if ttl is not None and (value is not None or not keep_stale):
+                self.cache.set(url, value, ttl, size=size)
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._pending[url]
+        return value
+
+    def _load(self, url, ttl, parse, endpoint):
+        value, ttl = self._fetch(url, ttl, endpoint)
+        if parse and value is not None:
+            try:
+                with METRICS.timer("parse_seconds", endpoint=endpoint):
+                    value = parse(value)
+            except Exception as exc:  # noqa: BLE001
+                logger.error(f"Error decoding content received from {url!r}: {exc}")  # noqa: TRY400
+                METRICS.count("fetches", endpoint=endpoint, result="invalid")
+                return None, self.negative_ttl, 0
+        return value, ttl, sizeof(value)
+
+    def _fetch(self, url, ttl, endpoint):
+        """
+        Return the text of a URL and how long to cache it.
+
+        Permanent misses, like a record that does not exist, give None and
+        a short lifetime. Transient failures, like a network or server
+        error, give the last copy fetched if there is one, or None and no
+        lifetime, so that nothing is cached.
+        """
         logger.debug(f"Fetching data from {url!r}")
         if not url.startswith("http"):
             msg = f"Invalid URL: {url!r}"
             raise ValueError(msg)
+        entry = self.disk_cache.get(url) if self.disk_cache else None
+        if entry and entry.age < ttl:
+            METRICS.count("fetches", endpoint=endpoint, result="disk")
+            return entry.text, ttl
         try:
-            response = urllib.request.urlopen(url)  # noqa: S310
-            content = response.read()
-            encoding = response.headers["content-type"].split("charset")[-1]
-            return content.decode(encoding)
+            with METRICS.timer("fetch_seconds", endpoint=endpoint):
+                response = self.transport.get(
+                    url, headers=entry.validators() if entry else None
+                )
         except Exception as exc:  # noqa: BLE001
-            logger.error(f"Error fetching data from {url!r}: {exc}")  # noqa: TRY400
+            # Don't repeat the error for every request refused by the breaker.
+            if isinstance(exc, CircuitOpenError):
+                logger.debug(f"Error fetching data from {url!r}: {exc}")
+                METRICS.count("fetches", endpoint=endpoint, result="circuit_open")
+            else:
+                logger.error(f"Error fetching data from {url!r}: {exc}")  # noqa: TRY400
+                METRICS.count("fetches", endpoint=endpoint, result="error")
+            return self._last_known_good(url, entry)
+        METRICS.count("received_bytes", len(response.content), endpoint=endpoint)
+        if entry and self.disk_cache and response.status == HTTPStatus.NOT_MODIFIED:
+            logger.debug(f"Cached copy of {url!r} is still valid")
+            METRICS.count("fetches", endpoint=endpoint, result="not_modified")
+            self.disk_cache.touch(entry)
+            return entry.text, ttl
+        if response.status != HTTPStatus.OK:
+            logger.error(f"Error fetching data from {url!r}: HTTP {response.status}")
+            METRICS.count("fetches", endpoint=endpoint, result=str(response.status))
+            if is_transient(response.status):
+                return self._last_known_good(url, entry)
+            return None, self.negative_ttl
+        return self._decode(url, response, ttl, endpoint)
+
+    def _decode(self, url, response, ttl, endpoint):
+        """Like _fetch, for a response that came with content."""
+        entry = CacheEntry(
+            url,
+            response.content,
+            encoding=response.encoding,
+            content_encoding=response.content_encoding,
+            etag=response.headers["etag"],
+            last_modified=response.headers["last-modified"],
+        )
+        try:
+            text = entry.text
+        except ValueError as exc:
+            logger.error(f"Error decoding content received from {url!r}: {exc}")  # noqa: TRY400
+            METRICS.count("fetches", endpoint=endpoint, result="invalid")
+            return None, self.negative_ttl
+        METRICS.count("fetches", endpoint=endpoint, result="ok")
+        if self.disk_cache:
+            self.disk_cache.set(entry)
+        return text, ttl
+
+    def _last_known_good(self, url, entry):
+        if entry is None:
+            return None, None
+        logger.info(f"Using copy of {url!r} fetched {entry.age:.0f}s ago")
+        return entry.text, self.negative_ttl
+
+    def _keep(self, url):
+        return self.keep is not None and self.keep(url)
+
+    def invalidate(self, predicate=None):
+        """Forget cached content of all URLs, or of those matching the predicate."""
+        self.cache.invalidate(predicate)
+        if self.disk_cache:
+            self.disk_cache.expire(predicate)
 
     def refresh(self):
-        self.cache.invalidate(self.get, "get")
+        self.invalidate()
+
+    def close(self):
+        self._revalidator.shutdown(wait=False)
+        self.transport.close()
+        if self.disk_cache:
+            self.disk_cache.close()
 
 
 class ORFClient:
@@ -48,8 +267,32 @@ class ORFClient:
         192: "q2a",
     }
 
-    def __init__(self, http_client=HttpClient(), backend=None):  # noqa: B008
+    # Cache lifetimes in seconds. The archive listing gains entries with
+    # every broadcast, and records of today's shows fill up while they air,
+    # but records of past days hardly ever change.
+    archive_ttl = 60
+    today_ttl = 120
+    past_day_ttl = 24 * 60 * 60
+
+    # Number of records fetched concurrently by get_days and get_shows. The
+    # transport limits the number of concurrent requests per host.
+    max_workers = 8
+
+    def __init__(self, http_client=None, backend=None):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="ORFClient"
+        )
+        self._closed = threading.Event()
+        if http_client is None:
+            http_client = _http_client(backend.config) if backend else HttpClient()
         self.http_client = http_client
+        self.http_client.keep = self._keep
+        # The record URL of the show being played.
+        self._current_show = None
+        # Objects with archive_fetched(station, archive) and
+        # show_fetched(station, day_id, show_id, show) methods, called
+        # whenever a freshly fetched archive listing or record is parsed.
+        self.listeners = []
         if backend:
             self.media_types = backend.config["orfradio"]["archive_types"]
             selected_bitrate = backend.config["orfradio"]["livestream_bitrate"]
@@ -59,28 +302,286 @@ class ORFClient:
             self.live_bitrate = "q2a"
 
     def get_day(self, station, day_id):
-        day_rec = self._get_day_json(station, day_id)
-        if not day_rec:
+        archive = self._get_archive(station)
+        if not archive:
+            return []
+
+        day = archive.get(day_id)
+        if day is None:
             return []
+        now = dt.datetime.now(tz=TZ)
+        return [broadcast for broadcast in day.broadcasts if broadcast.start < now]
+
+    def get_show(self, station, day_id, show_id):
+        show = self._get_show(station, day_id, show_id)
+        if not show:
+            return []
+        return show.items_for(self.media_types)
+
+    def get_days(self, days, timeout=None):
+        """
+        Get the shows of several days, given as (station, day_id) tuples,
+        fetching the archive listings concurrently.
 
-        def now(offset):
-            return dt.datetime.now(dt.timezone(dt.timedelta(milliseconds=offset)))
+        Days that fail come back empty, those not done within ``timeout``
+        seconds as None. Their fetches go on to fill the cache.
+        """
+        return self._map(self.get_day, days, timeout)
 
-        return [
-            _to_show(broadcast_rec)
-            for broadcast_rec in day_rec["broadcasts"]
-            if dateutil.parser.parse(broadcast_rec["startISO"])
-            < now(broadcast_rec["endOffset"])
+    def get_shows(self, shows, timeout=None):
+        """
+        Get the items of several shows, given as (station, day_id, show_id)
+        tuples, fetching their records concurrently.
+
+        Shows that fail come back empty, those not done within ``timeout``
+        seconds as None. Their fetches go on to fill the cache.
+        """
+        return self._map(self.get_show, shows, timeout)
+
+    def get_live_url(self, slug):
+        return self.live_uri % (slug, self.live_bitrate)
+
+    def get_on_air(self, station):
+        """
+        Find the show a station is airing, from its archive listing.
+
+        The title and moderator are taken from the show's record. Returns
+        None if the listing is not available or has no show on air.
+        """
+        archive = self._get_archive(station)
+        if not archive:
+            return None
+        now = dt.datetime.now(tz=TZ)
+        broadcasts = [
+            (broadcast, day.id)
+            for day in archive.values()
+            for broadcast in day.broadcasts
         ]
+        started = [entry for entry in broadcasts if entry[0].start <= now]
+        if not started:
+            return None
+        broadcast, day_id = max(started, key=lambda entry: entry[0].start)
+        until = min(
+            (b.start for b, _ in broadcasts if b.start > now),
+            default=None,
+        )
+        show = self._get_show(station, day_id, broadcast.id)
+        if not show:
+            return OnAir(title=broadcast.title, moderator="", until=until)
+        return OnAir(
+            title=show.whole_show.title, moderator=show.whole_show.artist, until=until
+        )
 
-    def get_show(self, station, day_id, show_id):
-        show_rec = self._get_record_json(station, show_id, day_id)
-        if not show_rec:
+    def get_item(self, station, day_id, show_id, item_id):
+        show = self._get_show(station, day_id, show_id)
+        if not show:
+            return None
+        return show.item_for(self.media_types, item_id)
+
+    def get_item_url(self, station, loopstream_slug, day_id, show_id, item_id):
+        show = self._get_show(station, day_id, show_id)
+        if not show:
+            return None
+
+        stream = show.stream_at(int(item_id.split("-")[0]))
+        if stream is None:
+            return ""
+        return self.get_stream_url(loopstream_slug, item_id, stream.start, stream.id)
+
+    def get_stream_url(self, loopstream_slug, item_id, stream_start, stream_id):
+        """
+        Build the URL of an item in the stream starting at ``stream_start``.
+
+        This needs no network I/O, the item's offsets follow from its id.
+        """
+        item_start, item_end, *_ = item_id.split("-", 1) + 1 * [None]
+        offsetstart = int(item_start) - stream_start
+        offsetende = int(item_end) - stream_start if item_end else ""
+        return self.show_uri % (
+            urllib.parse.quote(loopstream_slug, safe=""),
+            urllib.parse.quote(stream_id, safe=""),
+            offsetstart,
+            offsetende,
+        )
+
+    def set_current_show(self, station, day_id, show_id):
+        """Keep the record of the show being played in memory, if possible."""
+        self._current_show = self.record_uri % (station, show_id, day_id)
+
+    def refresh(self, station=None, day_id=None, show_id=None):
+        """
+        Drop cached data of a single show, a day, a station, or everything.
+        """
+        if station is None:
+            self.http_client.refresh()
+            return
+
+        archive_url = self.archive_uri % station
+        record_prefix = self.record_uri % (station, "", "")
+        record_prefix = record_prefix.rstrip("/") + "/"
+        if show_id is not None:
+            record_url = self.record_uri % (station, show_id, day_id)
+
+            def predicate(url):
+                return url == record_url
+        elif day_id is not None:
+
+            def predicate(url):
+                return url == archive_url or (
+                    url.startswith(record_prefix) and url.endswith(f"/{day_id}")
+                )
+        else:
+
+            def predicate(url):
+                return url == archive_url or url.startswith(record_prefix)
+
+        self.http_client.invalidate(predicate)
+
+    def close(self):
+        # Queued jobs are not cancelled, as concurrent.futures.wait() is not
+        # woken up for futures cancelled by shutdown(). They return at once
+        # instead, so that no call to _map is left waiting for them.
+        self._closed.set()
+        self._executor.shutdown(wait=False)
+        self.http_client.close()
+
+    def _map(self, func, args_list, timeout):
+        try:
+            jobs = [self._executor.submit(self._run, func, *args) for args in args_list]
+        except RuntimeError:
+            # Closed, so the executor takes no more jobs.
+            return [[] for _ in args_list]
+        concurrent.futures.wait(jobs, timeout=timeout)
+        results = []
+        for args, job in zip(args_list, jobs, strict=True):
+            if not job.done():
+                logger.debug(f"Gave up waiting for {func.__name__}{args}")
+                results.append(None)
+            elif job.cancelled():
+                results.append([])
+            elif job.exception():
+                logger.error(f"Error in {func.__name__}{args}: {job.exception()}")
+                results.append([])
+            else:
+                results.append(job.result())
+        return results
+
+    def _run(self, func, *args: object):
+        if self._closed.is_set():
             return []
+        return func(*args)
+
+    def _keep(self, url):
+        # Listings hold today's shows, and are needed for browsing any day.
+        return url == self._current_show or url.endswith(
+            self.archive_uri.rpartition("%s")[2]
+        )
+
+    def _get_archive(self, station) -> dict[str, "Day"] | None:
+        # HttpClient.get returns what the parse function made of the content.
+        archive = self.http_client.get(
+            self.archive_uri % station,
+            ttl=self.archive_ttl,
+            parse=functools.partial(self._parse_archive, station),
+            endpoint="archive",
+        )
+        return cast("dict[str, Day] | None", archive)
+
+    def _get_show(self, station, day_id, show_id) -> "Show | None":
+        ttl = self.past_day_ttl if _is_past_day(day_id) else self.today_ttl
+        show = self.http_client.get(
+            self.record_uri % (station, show_id, day_id),
+            ttl=ttl,
+            parse=functools.partial(self._parse_show, station, day_id, show_id),
+            endpoint="record",
+        )
+        return cast("Show | None", show)
+
+    def _parse_archive(self, station, content):
+        archive = _parse_archive(content)
+        self._notify("archive_fetched", (station, archive))
+        return archive
+
+    def _parse_show(self, station, day_id, show_id, content):
+        show = _parse_show(content, day_id)
+        self._notify("show_fetched", (station, day_id, show_id, show))
+        return show
+
+    def _notify(self, event, args):
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(*args)
+            except Exception:
+                logger.exception(f"Error in {event} listener {listener!r}")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Broadcast:
+    """A show as listed in the archive, before its record is fetched."""
+
+    id: str
+    start: dt.datetime
+    time: str
+    title: str
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Day:
+    """An archive day, with its broadcasts in the order they air."""
+
+    id: str
+    label: str
+    broadcasts: tuple[Broadcast, ...]
+
+
+@dataclasses.dataclass(frozen=True, slots=True, order=True)
+class Stream:
+    """A recording of (part of) a show, by its start time and loopStreamId."""
+
+    start: int
+    id: str
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class OnAir:
+    """The show a station is airing, and when the next one starts."""
+
+    title: str
+    moderator: str
+    until: dt.datetime | None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Item:
+    """A playable part of a show, or the whole show."""
+
+    id: str
+    title: str
+    time: str
+    artist: str
+    length: int
+    show_long: str
+    show_date: str
+    type: str
+    stream: Stream | None
+
+
+class Show:
+    """
+    A broadcast record, normalized once per fetched payload.
+
+    Instances are cached and shared by the library and playback providers,
+    so they must not be modified.
+    """
+
+    __slots__ = ("_filtered", "_stream_starts", "items", "streams", "whole_show")
+
+    def __init__(self, show_rec, day_id):
         # Sometimes the first item isn't at the beginning of the show, making
         # part of it inaccessible. So we add a fake "zeroth" item when that
         # happens:
         show_date = _get_day_label(day_id)
+        show_long = sys.intern(show_rec["title"])
         first_item = next(iter(show_rec["items"]), None)
         if first_item and show_rec["start"] < first_item["start"]:
             show_rec["items"].insert(
@@ -93,112 +594,177 @@ class ORFClient:
                 },
             )
 
-        items = [
-            {
-                "id": _generate_id(show_rec, i),
-                "title": _mojibake(track.get("title") or _generic_title(track)),
-                "time": track["startISO"],
+        # Sorted by start time:
+        self.streams = tuple(
+            sorted(
+                Stream(stream["start"], stream["loopStreamId"])
+                for stream in show_rec["streams"]
+            )
+        )
+        self._stream_starts = [stream.start for stream in self.streams]
+
+        self.items = tuple(
+            Item(
+                id=_generate_id(show_rec, i),
+                title=_mojibake(track.get("title") or _generic_title(track)),
+                time=track["startISO"],
                 # Note: .interpreter can be absent or null. the following
                 # statement accounts for both:
-                "artist": track.get("interpreter") or "",
-                "length": _calculate_length(show_rec, i),
-                "show_long": show_rec["title"],
-                "show_date": show_date,
-                "type": track["type"],
-            }
+                artist=sys.intern(track.get("interpreter") or ""),
+                length=_calculate_length(show_rec, i),
+                show_long=show_long,
+                show_date=show_date,
+                type=sys.intern(track["type"]),
+                stream=self.stream_at(track["start"]),
+            )
             for i, track in enumerate(show_rec["items"])
-            if track["type"] in self.media_types
-        ]
-        if not items:
-            # if the show contains no items, or none we are interested in, play
-            # the whole show.
-            items = [
-                {
-                    "id": str(show_rec["start"]),
-                    "title": _mojibake(show_rec["title"]),
-                    "time": show_rec["startISO"],
-                    "artist": show_rec.get("moderator") or "",
-                    "length": show_rec["end"] - show_rec["start"],
-                    "show_long": show_rec["title"],
-                    "show_date": show_date,
-                    "type": "",
-                }
-            ]
-
-        return items
-
-    def get_live_url(self, slug):
-        return ORFClient.live_uri % (slug, self.live_bitrate)
-
-    def get_item(self, station, day_id, show_id, item_id):
-        show = self.get_show(station, day_id, show_id)
-        return next(
-            item for item in show if item["id"].split("-")[0] == item_id.split("-")[0]
         )
-
-    def get_item_url(self, station, loopstream_slug, day_id, show_id, item_id):
-        json = self._get_record_json(station, show_id, day_id)
-        if not json:
-            return None
-
-        streams = json["streams"]
-        if len(streams) == 0:
-            return ""
-
-        item_start, item_end, *_ = item_id.split("-", 1) + 1 * [None]
-        stream = next(
-            stream for stream in reversed(streams) if stream["start"] <= int(item_start)
+        # If the show contains no items, or none we are interested in, play
+        # the whole show.
+        self.whole_show = Item(
+            id=str(show_rec["start"]),
+            title=_mojibake(show_rec["title"]),
+            time=show_rec["startISO"],
+            artist=sys.intern(show_rec.get("moderator") or ""),
+            length=show_rec["end"] - show_rec["start"],
+            show_long=show_long,
+            show_date=show_date,
+            type="",
+            stream=self.stream_at(show_rec["start"]),
         )
-        stream_id = stream["loopStreamId"]
-        offsetstart = int(item_start) - stream["start"]
-        offsetende = int(item_end) - stream["start"] if item_end else ""
-        return ORFClient.show_uri % (
-            loopstream_slug,
-            stream_id,
-            offsetstart,
-            offsetende,
-        )
-
-    def refresh(self):
-        self.http_client.refresh()
-
-    def _get_json(self, uri):
-        try:
-            content = self.http_client.get(uri)
-            return json.loads(content)
-        except Exception as exc:  # noqa: BLE001
-            logger.error(f"Error decoding content received from {uri!r}: {exc}")  # noqa: TRY400
-
-    def _get_archive_json(self, station):
-        return self._get_json(ORFClient.archive_uri % station)
-
-    def _get_day_json(self, station, day_id):
-        json = self._get_archive_json(station)
-        return next((rec for rec in json if _get_day_id(rec) == day_id), None)
+        self._filtered = {}
+
+    def items_for(self, media_types):
+        return self._filter(media_types)[0]
+
+    def item_for(self, media_types, item_id):
+        """
+        Find an item by its id, or only by its start time, which is stable
+        even when the start of the next item changes.
+        """
+        return self._filter(media_types)[1].get(item_id.split("-")[0])
+
+    def stream_at(self, time):
+        """The stream playing at ``time``."""
+        i = bisect.bisect_right(self._stream_starts, time)
+        return self.streams[i - 1] if i else None
+
+    def _filter(self, media_types):
+        key = frozenset(media_types)
+        result = self._filtered.get(key)
+        if result is None:
+            items = [item for item in self.items if item.type in key]
+            items = items or [self.whole_show]
+            index = {item.id.split("-")[0]: item for item in reversed(items)}
+            result = self._filtered[key] = (items, index)
+        return result
+
+
+def _parse_archive(content):
+    """
+    Index an archive listing by day id.
 
-    def _get_record_json(self, station, program_key, day):
-        return self._get_json(ORFClient.record_uri % (station, program_key, day))
+    The listing is decoded one day at a time, keeping only what a Day needs,
+    so the full descriptions of a week of broadcasts are never all in
+    memory at once.
+    """
+    archive = {}
+    for day_rec in _iter_json_array(content):
+        day_id = _get_day_id(day_rec)
+        archive[day_id] = Day(
+            id=day_id,
+            label=_get_day_label(day_id),
+            broadcasts=tuple(map(_to_broadcast, day_rec["broadcasts"])),
+        )
+    return archive
+
+
+def _iter_json_array(content):
+    """Decode the elements of a JSON array one by one."""
+    pos = _skip_whitespace(content, 0)
+    if not content.startswith("[", pos):
+        msg = "Expecting '['"
+        raise json.JSONDecodeError(msg, content, pos)
+    pos = _skip_whitespace(content, pos + 1)
+    if content.startswith("]", pos):
+        return
+    while True:
+        value, pos = _DECODER.raw_decode(content, pos)
+        yield value
+        pos = _skip_whitespace(content, pos)
+        if content.startswith("]", pos):
+            return
+        if not content.startswith(",", pos):
+            msg = "Expecting ',' delimiter"
+            raise json.JSONDecodeError(msg, content, pos)
+        pos = _skip_whitespace(content, pos + 1)
+
+
+def _skip_whitespace(content, pos):
+    # The pattern also matches an empty string, so there always is a match.
+    match = _WHITESPACE.match(content, pos)
+    return match.end() if match else pos
+
+
+def _parse_show(content, day_id):
+    return Show(json.loads(content), day_id)
+
+
+def _http_client(config):
+    transport = HttpTransport(
+        proxy=httpclient.format_proxy(config["proxy"]),
+        user_agent=httpclient.format_user_agent(f"{Extension.dist_name}/{__version__}"),
+    )
+    shared_cache = config["orfradio"]["shared_cache"]
+    if shared_cache:
+        disk_cache = SqliteCache(shared_cache)
+    else:
+        disk_cache = DiskCache(Extension.get_cache_dir(config) / "http")
+    return HttpClient(
+        disk_cache=disk_cache,
+        transport=transport,
+        max_stale=config["orfradio"]["cache_max_stale"],
+        max_size=config["orfradio"]["cache_max_size"] * 2**20 or None,
+    )
 
 
 def _get_day_id(day_rec):
     return str(day_rec["day"])
 
 
+def _is_past_day(day_id):
+    # An archive day starts at 06:00 and ends at 06:00 on the next day. Give
+    # late corrections by the broadcaster another hour to settle.
+    date = dt.datetime.strptime(day_id, "%Y%m%d").replace(tzinfo=TZ)
+    return dt.datetime.now(tz=TZ) > date + dt.timedelta(days=1, hours=7)
+
+
+@functools.lru_cache(maxsize=64)
 def _get_day_label(day_id):
     # The day id is a string in the form "YYYYMMDD".
     date = dt.datetime.strptime(day_id, "%Y%m%d").replace(tzinfo=TZ)
-    return date.strftime("%a %Y-%m-%d")
+    return sys.intern(date.strftime("%a %Y-%m-%d"))
 
 
-def _to_show(rec):
-    time = dateutil.parser.parse(rec["scheduledISO"])
+def _to_broadcast(rec):
+    time = _parse_datetime(rec["scheduledISO"])
 
     # Note: items with times < 06:00 are from the next day and should be last
-    return {
-        "id": rec["programKey"],
-        "time": time.strftime("%H:%M"),
-        "title": rec["title"] + (" *" if not rec["isBroadcasted"] else ""),
-    }
+    return Broadcast(
+        id=rec["programKey"],
+        start=_parse_datetime(rec["startISO"]),
+        time=sys.intern(time.strftime("%H:%M")),
+        title=sys.intern(rec["title"] + (" *" if not rec["isBroadcasted"] else "")),
+    )
+
+
+def _parse_datetime(text):
+    # The API gives ISO 8601 timestamps, which the standard library parses
+    # far faster than dateutil. Fall back to it for anything unusual.
+    try:
+        return dt.datetime.fromisoformat(text)
+    except ValueError:
+        return dateutil.parser.parse(text)
 
 
 def _generic_title(track):
@@ -0,0 +1,128 @@
+import datetime as dt
+import logging
+import threading
+
+import pykka
+from mopidy.core import CoreListener
+
+from mopidy_orfradio import TZ
+from mopidy_orfradio.backend import ORFBackend
+from mopidy_orfradio.library import (
+    InvalidORFUriError,
+    ORFLibraryUri,
+    ORFUris,
+    ORFUriType,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ORFLookaheadFrontend(pykka.ThreadingActor, CoreListener):
+    """
+    Passes the next few tracks of the tracklist to the backend, so that it
+    can resolve their playback URLs before they are played.
+    """
+
+    def __init__(self, config, core):
+        super().__init__()
+        self.core = core
+        self.depth = config["orfradio"]["lookahead_tracks"]
+
+    def track_playback_started(self, tl_track):  # noqa: ARG002
+        self._lookahead()
+
+    def tracklist_changed(self):
+        self._lookahead()
+
+    def _lookahead(self):
+        if not self.depth:
+            return
+        tl_tracks = self.core.tracklist.get_tl_tracks().get()
+        index = self.core.tracklist.index().get()
+        start = 0 if index is None else index + 1
+        uris = [
+            tl_track.track.uri
+            for tl_track in tl_tracks[start : start + self.depth]
+            if tl_track.track.uri.startswith("orfradio:")
+        ]
+        if not uris:
+            return
+        logger.debug(f"Resolving upcoming tracks: {uris}")
+        for backend in pykka.ActorRegistry.get_by_class(ORFBackend):
+            backend.proxy().preresolve(uris)
+
+
+class ORFLiveFrontend(pykka.ThreadingActor, CoreListener):
+    """
+    Announces the show on air as the stream title while a live stream plays.
+
+    The show is looked up in the station's archive listing when playback
+    starts, and again when the next show is due to start, by a timer.
+    """
+
+    # Seconds after the start of the next show to look it up.
+    delay = 1
+    # Seconds to wait before looking again, if the listing doesn't have the
+    # next show yet.
+    retry = 600
+
+    def __init__(self, config, core):
+        super().__init__()
+        self.core = core
+        self.enabled = config["orfradio"]["live_metadata"]
+        self._station = None
+        self._timer = None
+
+    def on_stop(self):
+        self._cancel()
+
+    def track_playback_started(self, tl_track):
+        self._cancel()
+        self._station = None
+        uri = tl_track.track.uri
+        if not self.enabled or not uri.startswith(f"{ORFUris.ROOT}:"):
+            return
+        try:
+            library_uri = ORFLibraryUri.parse(uri)
+        except InvalidORFUriError:
+            return
+        station = library_uri.station
+        if library_uri.uri_type != ORFUriType.LIVE or station is None:
+            return
+        # Stations without a loopstream slug have no archive to tell the
+        # show on air from.
+        if ORFUris.stations.get(station, (station, None))[1]:
+            self._station = station
+            self.update_on_air()
+
+    def track_playback_ended(self, tl_track, time_position):  # noqa: ARG002
+        self._cancel()
+        self._station = None
+
+    def update_on_air(self):
+        """Announce the show on air, and arm the timer for the next one."""
+        self._cancel()
+        if self._station is None:
+            return
+        on_air = None
+        for backend in pykka.ActorRegistry.get_by_class(ORFBackend):
+            on_air = backend.proxy().get_on_air(self._station).get()
+        delay = self.retry
+        if on_air is not None:
+            logger.debug(f"On air on {self._station}: {on_air.title!r}")
+            CoreListener.send("stream_title_changed", title=on_air.title)
+            if on_air.until is not None:
+                now = dt.datetime.now(tz=TZ)
+                delay = max(0, (on_air.until - now).total_seconds()) + self.delay
+        self._timer = threading.Timer(delay, self._due)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _due(self):
+        # Called in the timer's thread, so hand over to the actor.
+        self.actor_ref.proxy().update_on_air()
+
+    def _cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
+import dataclasses
 import datetime
+import functools
 import logging
 import re
-import urllib
+import urllib.parse
 from enum import IntEnum
 from typing import ClassVar, override
 
 from mopidy import backend
-from mopidy.models import Album, Artist, Ref, Track
+from mopidy.models import Album, Artist, Ref, SearchResult, Track
 
 from mopidy_orfradio import TZ
 from mopidy_orfradio.client import ORFClient
+from mopidy_orfradio.metrics import METRICS
+from mopidy_orfradio.search import SearchIndex
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +45,11 @@ class ORFUris:
 class ORFLibraryProvider(backend.LibraryProvider):
     root_directory = Ref.directory(uri=f"{ORFUris.ROOT}:", name="ORF Radio")
 
+    # Seconds a lookup waits for the records of several shows, so that a
+    # slow API doesn't hold up the backend for long. Shows not fetched by
+    # then are left out, their records are cached for later lookups.
+    lookup_timeout = 10
+
     def __init__(self, backend, client=None):
         super().__init__(backend)
         self.client = client or ORFClient(backend=self.backend)
@@ -49,8 +58,13 @@ class ORFLibraryProvider(backend.LibraryProvider):
             for slug, (name, _) in ORFUris.stations.items()
             if slug in self.backend.config["orfradio"]["stations"]
         ]
+        # Kept up to date with every archive listing and broadcast record the
+        # client fetches, by browsing, lookups or prefetching.
+        self.index = SearchIndex()
+        self.client.listeners.append(self)
 
     @override
+    @METRICS.timed("call_seconds", call="browse")
     def browse(self, uri):
         try:
             library_uri = ORFLibraryUri.parse(uri)
@@ -109,16 +123,16 @@ class ORFLibraryProvider(backend.LibraryProvider):
         return [live, *archive]
 
     def _get_track_title(self, item, *, afterhours=False):
-        time = item["time"]
+        time = item.time
         if afterhours and self.backend.config["orfradio"]["afterhours"]:
             time = re.sub(r"^0([0-4]:)", r"O\1", time)
-        return "{}: {}".format(time, item["title"])
+        return f"{time}: {item.title}"
 
     def _browse_day(self, station, day_id):
         return [
             Ref.directory(
                 uri=str(
-                    ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, station, day_id, show["id"])
+                    ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, station, day_id, show.id)
                 ),
                 name=self._get_track_title(show, afterhours=True),
             )
@@ -134,7 +148,7 @@ class ORFLibraryProvider(backend.LibraryProvider):
                         station,
                         day_id,
                         show_id,
-                        item["id"],
+                        item.id,
                     )
                 ),
                 name=self._get_track_title(item),
@@ -143,6 +157,7 @@ class ORFLibraryProvider(backend.LibraryProvider):
         ]
 
     @override
+    @METRICS.timed("call_seconds", call="lookup")
     def lookup(self, uri):  # noqa: PLR0911
         try:
             library_uri = ORFLibraryUri.parse(uri)
@@ -158,13 +173,13 @@ class ORFLibraryProvider(backend.LibraryProvider):
                 )
                 return []
             case ORFUriType.LIVE:
-                return [Track(uri=str(library_uri), name="Live")]
+                return [self._lookup_live(library_uri)]
             case ORFUriType.STATION:
                 return self._browse_station(library_uri.station)
             case ORFUriType.ARCHIVE_DAY:
-                return self._browse_day(library_uri.station, library_uri.day_id)
+                return self._lookup_day(library_uri.station, library_uri.day_id)
             case ORFUriType.ARCHIVE_SHOW:
-                return self._browse_show(
+                return self._lookup_show(
                     library_uri.station, library_uri.day_id, library_uri.show_id
                 )
             case ORFUriType.ARCHIVE_ITEM:
@@ -175,50 +190,198 @@ class ORFLibraryProvider(backend.LibraryProvider):
                     library_uri.item_id,
                 )
 
+    @override
+    @METRICS.timed("call_seconds", call="lookup_many")
+    def lookup_many(self, uris):
+        # Fetch every record the URIs refer to up front, concurrently and
+        # only once each, so the lookups below are served from the cache.
+        show_of = {}
+        for uri in uris:
+            try:
+                library_uri = ORFLibraryUri.parse(uri)
+            except InvalidORFUriError:
+                continue
+            if library_uri.uri_type in (
+                ORFUriType.ARCHIVE_SHOW,
+                ORFUriType.ARCHIVE_ITEM,
+            ):
+                show_of[uri] = (
+                    library_uri.station,
+                    library_uri.day_id,
+                    library_uri.show_id,
+                )
+        shows = sorted(set(show_of.values()))
+        results = self.client.get_shows(shows, timeout=self.lookup_timeout)
+        late = {
+            show for show, items in zip(shows, results, strict=True) if items is None
+        }
+
+        return {
+            uri: [] if show_of.get(uri) in late else self.lookup(uri) for uri in uris
+        }
+
+    def _lookup_live(self, library_uri):
+        name, loopstream_slug = ORFUris.stations.get(
+            library_uri.station, (library_uri.station, None)
+        )
+        # Stations without a loopstream slug have no archive to tell the
+        # show on air from.
+        on_air = (
+            self.client.get_on_air(library_uri.station) if loopstream_slug else None
+        )
+        if on_air is None:
+            return Track(uri=str(library_uri), name="Live")
+        return Track(
+            uri=str(library_uri),
+            name=on_air.title,
+            artists=[Artist(name=on_air.moderator)] if on_air.moderator else [],
+            album=Album(name=f"{name} Live"),
+        )
+
+    def _lookup_day(self, station, day_id):
+        shows = [
+            (station, day_id, show.id) for show in self.client.get_day(station, day_id)
+        ]
+        return [
+            self._to_track(station, day_id, show_id, item)
+            for (_, _, show_id), items in zip(
+                shows,
+                self.client.get_shows(shows, timeout=self.lookup_timeout),
+                strict=True,
+            )
+            for item in items or []
+        ]
+
+    def _lookup_show(self, station, day_id, show_id):
+        return [
+            self._to_track(station, day_id, show_id, item)
+            for item in self.client.get_show(station, day_id, show_id)
+        ]
+
     def _lookup_item(self, station, day_id, show_id, item_id):
         item = self.client.get_item(station, day_id, show_id, item_id)
-        return [
-            Track(
-                uri=str(
-                    ORFLibraryUri(
-                        ORFUriType.ARCHIVE_ITEM,
-                        station,
-                        day_id,
-                        show_id,
-                        item["id"],
+        if item is None:
+            return []
+        return [self._to_track(station, day_id, show_id, item)]
+
+    def _to_track(self, station, day_id, show_id, item):
+        # Carry the stream in the URI, so playing the track needs no request.
+        stream = item.stream
+        return Track(
+            uri=str(
+                ORFLibraryUri(
+                    ORFUriType.ARCHIVE_ITEM,
+                    station,
+                    day_id,
+                    show_id,
+                    item.id,
+                    stream_id=stream.id if stream else None,
+                    stream_start=stream.start if stream else None,
+                )
+            ),
+            artists=[Artist(name=item.artist)],
+            length=item.length,
+            album=Album(name=f"{item.show_long} ({item.show_date})"),
+            genre=item.type,
+            name=item.title,
+        )
+
+    @override
+    @METRICS.timed("call_seconds", call="search")
+    def search(self, query, uris=None, exact=False):
+        results = self.index.search(query, uris, exact=exact)
+        return SearchResult(
+            uri=f"{ORFUris.ROOT}:search",
+            tracks=tuple(result for result in results if isinstance(result, Track)),
+            albums=tuple(result for result in results if isinstance(result, Album)),
+        )
+
+    def archive_fetched(self, station, archive):
+        # Forget days that dropped out of the archive, with all their shows.
+        self.index.remove(lambda group: group[0] == station and group[1] not in archive)
+        now = datetime.datetime.now(tz=TZ)
+        for day_id, day in archive.items():
+            self.index.update(
+                (station, day_id),
+                [
+                    (
+                        Album(
+                            uri=str(
+                                ORFLibraryUri(
+                                    ORFUriType.ARCHIVE_SHOW, station, day_id, show.id
+                                )
+                            ),
+                            name=f"{show.title} ({day.label})",
+                        ),
+                        {"album": show.title},
                     )
-                ),
-                artists=[Artist(name=item["artist"])],
-                length=item["length"],
-                album=Album(name=f"{item['show_long']} ({item['show_date']})"),
-                genre=item["type"],
-                name=item["title"],
+                    for show in day.broadcasts
+                    if show.start < now
+                ],
             )
-        ]
+
+    def show_fetched(self, station, day_id, show_id, show):
+        self.index.update(
+            (station, day_id, show_id),
+            [
+                (
+                    self._to_track(station, day_id, show_id, item),
+                    {
+                        "track_name": item.title,
+                        "album": item.show_long,
+                        "artist": item.artist,
+                        "genre": item.type,
+                    },
+                )
+                for item in show.items_for(self.client.media_types)
+            ],
+        )
 
     @override
+    @METRICS.timed("call_seconds", call="refresh")
     def refresh(self, uri=None):
-        self.client.refresh()
+        if uri is None:
+            self.client.refresh()
+            return
 
+        try:
+            library_uri = ORFLibraryUri.parse(uri)
+        except InvalidORFUriError as e:
+            logger.error(e)  # noqa: TRY400
+            return
+
+        match library_uri.uri_type:
+            case ORFUriType.ROOT:
+                self.client.refresh()
+            case ORFUriType.STATION | ORFUriType.LIVE:
+                self.client.refresh(library_uri.station)
+            case ORFUriType.ARCHIVE_DAY:
+                self.client.refresh(library_uri.station, library_uri.day_id)
+            case ORFUriType.ARCHIVE_SHOW | ORFUriType.ARCHIVE_ITEM:
+                self.client.refresh(
+                    library_uri.station, library_uri.day_id, library_uri.show_id
+                )
 
-class ORFLibraryUri:
-    def __init__(
-        self,
-        uri_type: ORFUriType,
-        station_slug=None,
-        day_id=None,
-        show_id=None,
-        item_id=None,
-    ):
-        self.uri_type = uri_type
-        self.station = station_slug
-        self.day_id = day_id
-        self.show_id = show_id
-        self.item_id = item_id
 
+@dataclasses.dataclass(frozen=True, slots=True)
+class ORFLibraryUri:
+    uri_type: ORFUriType
+    station: str | None = None
+    day_id: str | None = None
+    show_id: str | None = None
+    item_id: str | None = None
+    _: dataclasses.KW_ONLY
+    # The loopStreamId and start of the stream an archive item is part of.
+    # Optional, older item URIs don't have them.
+    stream_id: str | None = None
+    stream_start: int | None = None
+
+    # URIs are parsed again for every browse, lookup and playback, mostly
+    # the same few ones. Parsed URIs are immutable, so they can be shared.
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def parse(uri):
-        _scheme, _, path, _, _ = urllib.parse.urlsplit(uri)
+        _scheme, _, path, query, _ = urllib.parse.urlsplit(uri)
         station, live_or_day, show, item, *_ = path.split("/", 4) + 4 * [None]
 
         if station == "":
@@ -227,16 +390,29 @@ class ORFLibraryUri:
             return ORFLibraryUri(ORFUriType.STATION, station)
         if live_or_day == "live":
             return ORFLibraryUri(ORFUriType.LIVE, station)
+        if not _is_day_id(live_or_day) or (item and not _ITEM_ID.fullmatch(item)):
+            raise InvalidORFUriError(uri)
         if item:
+            params = urllib.parse.parse_qs(query)
+            stream_id = params.get("stream", [None])[0]
+            stream_start = params.get("start", [""])[0]
+            if not (
+                stream_id and _STREAM_ID.fullmatch(stream_id) and stream_start.isdigit()
+            ):
+                stream_id = stream_start = None
             return ORFLibraryUri(
-                ORFUriType.ARCHIVE_ITEM, station, live_or_day, show, item
+                ORFUriType.ARCHIVE_ITEM,
+                station,
+                live_or_day,
+                show,
+                item,
+                stream_id=stream_id,
+                stream_start=int(stream_start) if stream_start else None,
             )
         if show:
             return ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, station, live_or_day, show)
         return ORFLibraryUri(ORFUriType.ARCHIVE_DAY, station, live_or_day)
 
-        raise InvalidORFUriError(uri)
-
     @property
     def loopstream(self):
         _name, loopstream_slug = ORFUris.stations[self.station]
@@ -255,10 +431,31 @@ class ORFLibraryUri:
             case ORFUriType.ARCHIVE_SHOW:
                 return f"{ORFUris.ROOT}:{self.station}/{self.day_id}/{self.show_id}"
             case ORFUriType.ARCHIVE_ITEM:
-                return (
+                uri = (
                     f"{ORFUris.ROOT}:{self.station}/{self.day_id}"
                     f"/{self.show_id}/{self.item_id}"
                 )
+                if self.stream_id is not None:
+                    query = urllib.parse.urlencode(
+                        {"stream": self.stream_id, "start": self.stream_start}
+                    )
+                    uri = f"{uri}?{query}"
+                return uri
+
+
+# Item ids are the start, and optionally the end, of an item in milliseconds.
+_ITEM_ID = re.compile(r"\d+(-\d+)?")
+# loopStreamIds are file names, like "2020-04-09_1000_tl_54_7DaysThu6_96335.mp3".
+_STREAM_ID = re.compile(r"[\w.-]+", re.ASCII)
+
+
+def _is_day_id(text):
+    # Day ids are dates in the form "YYYYMMDD".
+    try:
+        datetime.datetime.strptime(text, "%Y%m%d")  # noqa: DTZ007
+    except ValueError:
+        return False
+    return len(text) == 8  # noqa: PLR2004
 
 
 class InvalidORFUriError(TypeError):
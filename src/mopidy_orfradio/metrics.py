@@ -0,0 +1,208 @@
+import bisect
+import contextlib
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    # Upper bounds of the buckets, in seconds.
+    buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+
+        Returns None if it is above the largest bound, which JSON can't
+        represent as infinity.
+        """
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+
+class Metrics:
+    """
+    Counters and latency histograms, labelled e.g. by endpoint.
+
+    A metric is identified by its name and its labels, given as keyword
+    arguments. All methods are thread-safe.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, value=1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels: str):
+        """Decorate a function to record its run time."""
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args: object, **kwargs: object):
+                with self.timer(name, **labels):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """All metrics as a JSON serializable dict."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                    "buckets": dict(
+                        zip(map(str, (*h.buckets, "+Inf")), h.counts, strict=True)
+                    ),
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def prometheus(self, prefix="orfradio"):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.extend(
+                    f"{prefix}_{name}_total{_labels(labels)} {value}"
+                    for (n, labels), value in sorted(self._counters.items())
+                    if n == name
+                )
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (n, labels), h in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*h.buckets, "+Inf"), h.counts, strict=True
+                    ):
+                        cumulative += count
+                        bucket_labels = (*labels, ("le", str(bound)))
+                        lines.append(
+                            f"{prefix}_{name}_bucket{_labels(bucket_labels)} "
+                            f"{cumulative}"
+                        )
+                    lines.append(f"{prefix}_{name}_sum{_labels(labels)} {h.sum}")
+                    lines.append(f"{prefix}_{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """A one-line overview of cache efficiency and fetch latency."""
+        with self._lock:
+            results = {}
+            received = 0
+            for (name, labels), value in self._counters.items():
+                if name == "cache_requests":
+                    result = dict(labels)["result"]
+                    results[result] = results.get(result, 0) + value
+                elif name == "received_bytes":
+                    received += value
+            fetches = Histogram()
+            for (name, _), h in self._histograms.items():
+                if name == "fetch_seconds":
+                    fetches.count += h.count
+                    fetches.sum += h.sum
+                    fetches.counts = [
+                        a + b for a, b in zip(fetches.counts, h.counts, strict=True)
+                    ]
+        requests = sum(results.values())
+        hits = results.get("hit", 0)
+        p95 = fetches.quantile(0.95)
+        latency = f"p95 > {fetches.buckets[-1]}s" if p95 is None else f"p95 < {p95}s"
+        return (
+            f"{requests} requests, "
+            f"{hits / requests if requests else 0:.0%} memory cache hits "
+            f"({', '.join(f'{n} {r}' for r, n in sorted(results.items())) or '-'}), "
+            f"{fetches.count} fetches, {latency}, "
+            f"{received / 2**20:.1f} MiB received"
+        )
+
+
+class MetricsLogger:
+    """Logs a summary of the metrics at debug level every ``interval`` seconds."""
+
+    def __init__(self, metrics, interval):
+        self.metrics = metrics
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.run, name="ORFMetrics", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"ORF radio metrics: {self.metrics.summary()}")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+# Shared by the backend and the HTTP handler serving the metrics.
+METRICS = Metrics()
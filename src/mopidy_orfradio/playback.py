@@ -4,26 +4,41 @@ from mopidy import backend
 
 from mopidy_orfradio.client import ORFClient
 from mopidy_orfradio.library import InvalidORFUriError, ORFLibraryUri, ORFUriType
+from mopidy_orfradio.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 
 
 class ORFPlaybackProvider(backend.PlaybackProvider):
-    def __init__(self, audio, backend, client=None):
+    def __init__(self, audio, backend, client=None, segments=None):
         super().__init__(audio, backend)
         self.client = client or ORFClient(backend=self.backend)
+        # Local copies of archive audio, if enabled.
+        self.segments = segments
 
+    @METRICS.timed("call_seconds", call="translate_uri")
     def translate_uri(self, uri):
         try:
             library_uri = ORFLibraryUri.parse(uri)
         except InvalidORFUriError:
             return None
 
+        if library_uri.uri_type == ORFUriType.ARCHIVE_ITEM:
+            self.client.set_current_show(
+                library_uri.station, library_uri.day_id, library_uri.show_id
+            )
         match library_uri.uri_type:
             case ORFUriType.LIVE:
                 return self.client.get_live_url(library_uri.station)
+            case ORFUriType.ARCHIVE_ITEM if library_uri.stream_id is not None:
+                url = self.client.get_stream_url(
+                    library_uri.loopstream,
+                    library_uri.item_id,
+                    library_uri.stream_start,
+                    library_uri.stream_id,
+                )
             case ORFUriType.ARCHIVE_ITEM:
-                return self.client.get_item_url(
+                url = self.client.get_item_url(
                     library_uri.station,
                     library_uri.loopstream,
                     library_uri.day_id,
@@ -32,3 +47,7 @@ class ORFPlaybackProvider(backend.PlaybackProvider):
                 )
             case _:
                 return None
+        if url and self.segments:
+            # Play the local copy of the item's audio, if there is one.
+            return self.segments.get(url) or url
+        return url
@@ -0,0 +1,166 @@
+import concurrent.futures
+import contextlib
+import datetime as dt
+import logging
+import os
+import threading
+import time
+
+from mopidy_orfradio import TZ
+from mopidy_orfradio.library import InvalidORFUriError, ORFLibraryUri, ORFUriType
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Warms the caches of an ORFClient in the background.
+
+    First the archive listings of all stations are loaded concurrently, then
+    the records of all shows of the last few days are fetched by a small pool
+    of worker threads running at low priority. With ``days`` set to 0, only
+    the listings are loaded.
+    """
+
+    def __init__(self, client, stations, days, workers):
+        self.client = client
+        self.stations = stations
+        self.days = days
+        self.workers = workers
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.run, name="ORFPrefetcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        start = time.monotonic()
+        today = dt.datetime.now(tz=TZ).date()
+        if not self.days:
+            logger.info(
+                f"Loading the archive listings of {len(self.stations)} "
+                "ORF radio stations"
+            )
+            self._list_shows([today.strftime("%Y%m%d")])
+            return
+        day_ids = [
+            (today - dt.timedelta(days=d)).strftime("%Y%m%d") for d in range(self.days)
+        ]
+        logger.info(
+            f"Prefetching {len(day_ids)} archive days of "
+            f"{len(self.stations)} ORF radio stations"
+        )
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="ORFPrefetcher",
+            initializer=_lower_priority,
+        ) as executor:
+            jobs = [
+                executor.submit(self._fetch_show, station, day_id, show_id)
+                for station, day_id, show_id in self._list_shows(day_ids)
+            ]
+            logger.debug(f"Prefetching {len(jobs)} show records")
+
+            fetched = 0
+            for i, job in enumerate(concurrent.futures.as_completed(jobs), 1):
+                if self._stopped.is_set():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    logger.info("Prefetching cancelled")
+                    return
+                fetched += job.result()
+                if i % 100 == 0:
+                    logger.debug(f"Prefetched {i}/{len(jobs)} show records")
+
+        logger.info(
+            f"Prefetched {fetched} show records in {time.monotonic() - start:.1f}s"
+        )
+
+    def _list_shows(self, day_ids):
+        if self._stopped.is_set():
+            return []
+        days = [(station, day_id) for station in self.stations for day_id in day_ids]
+        return [
+            (station, day_id, show.id)
+            for (station, day_id), shows in zip(
+                days, self.client.get_days(days), strict=True
+            )
+            for show in shows
+        ]
+
+    def _fetch_show(self, station, day_id, show_id):
+        if self._stopped.is_set():
+            return 0
+        try:
+            self.client.get_show(station, day_id, show_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug(f"Failed to prefetch {station}/{day_id}/{show_id}: {exc}")
+            return 0
+        return 1
+
+
+class Lookahead:
+    """
+    Resolves the playback URLs of upcoming archive items in the background.
+
+    Resolving an item URI fetches the record of its show, which is then
+    cached when the item is played. URIs that carry their stream need no
+    record to be played. With a SegmentCache, the audio of the items is
+    downloaded as well.
+    """
+
+    def __init__(self, client, workers, segments=None):
+        self.client = client
+        self.segments = segments
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ORFLookahead"
+        )
+
+    def submit(self, uris):
+        for uri in uris:
+            try:
+                library_uri = ORFLibraryUri.parse(uri)
+            except InvalidORFUriError:
+                continue
+            if library_uri.uri_type == ORFUriType.ARCHIVE_ITEM and (
+                library_uri.stream_id is None or self.segments
+            ):
+                self._executor.submit(self._resolve, library_uri)
+
+    def stop(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _resolve(self, library_uri):
+        try:
+            if library_uri.stream_id is None:
+                url = self.client.get_item_url(
+                    library_uri.station,
+                    library_uri.loopstream,
+                    library_uri.day_id,
+                    library_uri.show_id,
+                    library_uri.item_id,
+                )
+            else:
+                url = self.client.get_stream_url(
+                    library_uri.loopstream,
+                    library_uri.item_id,
+                    library_uri.stream_start,
+                    library_uri.stream_id,
+                )
+            if url and self.segments:
+                self.segments.fill(url)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug(f"Failed to resolve {library_uri}: {exc}")
+
+
+def _lower_priority():
+    # On Linux every thread can have its own nice value. Elsewhere this is
+    # not supported, and the workers run at normal priority.
+    with contextlib.suppress(AttributeError, OSError):
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
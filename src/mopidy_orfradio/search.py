@@ -0,0 +1,104 @@
+import threading
+from collections import defaultdict
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over shows and show items.
+
+    Documents are Mopidy models (shows as albums, items as tracks) together
+    with the text of the fields they can be searched by. They are added in
+    groups, e.g. all items of one show, and a group is replaced as a whole
+    when its source is fetched again.
+
+    Every field value is indexed by its trigrams. A query value narrows the
+    candidates down to documents containing all of its trigrams, which are
+    then checked for an actual match.
+    """
+
+    fields = ("track_name", "album", "artist", "genre")
+
+    def __init__(self):
+        self._documents = {}
+        self._groups = defaultdict(set)
+        self._trigrams = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def update(self, group, documents):
+        """
+        Replace the documents of a group.
+
+        ``documents`` are (model, fields) pairs, where fields maps field names
+        to the text the model should be found by.
+        """
+        with self._lock:
+            self._remove(group)
+            for model, texts in documents:
+                uri = model.uri
+                fields = {name: text.casefold() for name, text in texts.items() if text}
+                self._documents[uri] = (model, group, fields)
+                self._groups[group].add(uri)
+                for value in fields.values():
+                    for trigram in _trigrams(value):
+                        self._trigrams[trigram].add(uri)
+
+    def remove(self, predicate):
+        """Remove all groups matching the predicate."""
+        with self._lock:
+            for group in [group for group in self._groups if predicate(group)]:
+                self._remove(group)
+
+    def search(self, query, uris=None, *, exact=False):
+        """Return the models matching all values of the query."""
+        with self._lock:
+            candidates = None
+            for field, values in query.items():
+                if field != "any" and field not in self.fields:
+                    return []
+                for value in map(str.casefold, map(str, values)):
+                    candidates = {
+                        uri
+                        for uri in self._candidates(value, candidates)
+                        if _matches(self._documents[uri][2], field, value, exact=exact)
+                    }
+            if candidates is None:
+                return []
+            return [
+                self._documents[uri][0]
+                for uri in sorted(candidates)
+                if not uris or any(uri.startswith(prefix) for prefix in uris)
+            ]
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _candidates(self, value, candidates):
+        trigrams = _trigrams(value)
+        if not trigrams:
+            return self._documents if candidates is None else candidates
+        postings = sorted((self._trigrams.get(t, set()) for t in trigrams), key=len)
+        if candidates is not None:
+            postings.insert(0, candidates)
+        return set.intersection(*postings)
+
+    def _remove(self, group):
+        for uri in self._groups.pop(group, ()):
+            _, _, fields = self._documents.pop(uri)
+            for value in fields.values():
+                for trigram in _trigrams(value):
+                    postings = self._trigrams.get(trigram)
+                    if postings is not None:
+                        postings.discard(uri)
+                        if not postings:
+                            del self._trigrams[trigram]
+
+
+def _trigrams(value):
+    return {value[i : i + 3] for i in range(len(value) - 2)}
+
+
+def _matches(fields, field, value, *, exact):
+    values = fields.values() if field == "any" else [fields.get(field, "")]
+    if exact:
+        return value in values
+    return any(value in text for text in values)
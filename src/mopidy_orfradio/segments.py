@@ -0,0 +1,146 @@
+import hashlib
+import http.client
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from mopidy_orfradio.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentCache:
+    """
+    Local copies of archive audio segments, by their loopstream URL.
+
+    Segments are downloaded in the background by :meth:`fill`, after which
+    :meth:`get` gives the URI of the local copy, so that starting, seeking
+    and replaying them needs no remote server. Segments not played for
+    ``max_age`` seconds are dropped, and then the least recently played
+    ones while all of them take more than ``max_size`` bytes.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path,
+        max_size,
+        max_age,
+        *,
+        proxy=None,
+        user_agent=None,
+        timeout=15,
+    ):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.max_age = max_age
+        self.timeout = timeout
+        handlers = []
+        if proxy:
+            handlers.append(
+                urllib.request.ProxyHandler({"http": proxy, "https": proxy})
+            )
+        self._opener = urllib.request.build_opener(*handlers)
+        self._headers = {"User-Agent": user_agent} if user_agent else {}
+        # URLs currently being downloaded.
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Return the file URI of a segment's local copy, or None."""
+        path = self._path(url)
+        try:
+            fetched = path.stat().st_mtime
+        except FileNotFoundError:
+            METRICS.count("audio_cache_requests", result="miss")
+            return None
+        if time.time() - fetched > self.max_age:
+            path.unlink(missing_ok=True)
+            METRICS.count("audio_cache_requests", result="miss")
+            return None
+        # The modification time records when a segment was last played.
+        self._touch(path)
+        METRICS.count("audio_cache_requests", result="hit")
+        return path.as_uri()
+
+    def fill(self, url):
+        """Download a segment, unless it is cached or downloading already."""
+        path = self._path(url)
+        with self._lock:
+            if url in self._pending or path.exists():
+                return
+            self._pending.add(url)
+        try:
+            with METRICS.timer("audio_fill_seconds"):
+                size = self._download(url, path)
+        except (OSError, ValueError, http.client.HTTPException) as exc:
+            logger.debug(f"Failed to cache audio from {url!r}: {exc}")
+            METRICS.count("audio_fills", result="error")
+            return
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+        logger.debug(f"Cached {size / 2**20:.1f} MiB of audio from {url!r}")
+        METRICS.count("audio_fills", result="ok")
+        self.evict()
+
+    def evict(self):
+        """Drop old segments, then the least recently played over the budget."""
+        now = time.time()
+        segments = []
+        for path in self.path.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                # Also drops downloads left unfinished by a crash.
+                path.unlink(missing_ok=True)
+            elif path.suffix != ".tmp":
+                segments.append((stat.st_mtime, stat.st_size, path))
+        size = sum(size for _, size, _ in segments)
+        for _, segment_size, path in sorted(segments):
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= segment_size
+
+    def _download(self, url, path):
+        request = urllib.request.Request(url, headers=self._headers)  # noqa: S310
+        fd, tmp_name = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        size = 0
+        try:
+            with (
+                os.fdopen(fd, "wb") as f,
+                self._opener.open(request, timeout=self.timeout) as response,
+            ):
+                while size <= self.max_size and (
+                    chunk := response.read(self.chunk_size)
+                ):
+                    size += len(chunk)
+                    f.write(chunk)
+            if size > self.max_size:
+                msg = "Segment is larger than the cache"
+                raise ValueError(msg)  # noqa: TRY301
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        finally:
+            METRICS.count("audio_received_bytes", size)
+        return size
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError as exc:
+            logger.debug(f"Failed to update cached audio {path}: {exc}")
+
+    def _path(self, url):
+        return self.path / (hashlib.sha1(url.encode()).hexdigest() + ".mp3")  # noqa: S324
@@ -0,0 +1,318 @@
+import base64
+import http.client
+import logging
+import threading
+import time
+import urllib.parse
+import urllib.request
+import zlib
+from http import HTTPStatus
+
+logger = logging.getLogger(__name__)
+
+
+class HttpResponse:
+    def __init__(self, status, headers, content):
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def encoding(self):
+        return self.headers.get_content_charset() or "utf-8"
+
+    @property
+    def content_encoding(self):
+        return self.headers.get("Content-Encoding")
+
+
+def decompress(content, content_encoding):
+    """Undo the Content-Encoding of a response body."""
+    coding = (content_encoding or "identity").strip().lower()
+    if coding == "identity":
+        return content
+    if coding in ("gzip", "x-gzip"):
+        wbits = 16 + zlib.MAX_WBITS
+    elif coding == "deflate":
+        # Meant to be zlib wrapped, but some servers send raw deflate data.
+        wbits = zlib.MAX_WBITS if content[:1] == b"\x78" else -zlib.MAX_WBITS
+    else:
+        msg = f"Unsupported content encoding: {content_encoding!r}"
+        raise ValueError(msg)
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        data = decompressor.decompress(content) + decompressor.flush()
+    except zlib.error as exc:
+        msg = f"Invalid {coding} content: {exc}"
+        raise ValueError(msg) from exc
+    if not decompressor.eof:
+        msg = f"Truncated {coding} content"
+        raise ValueError(msg)
+    return data
+
+
+class CircuitOpenError(OSError):
+    pass
+
+
+def is_transient(status):
+    """Whether an HTTP error status may go away when the request is repeated."""
+    return (
+        status >= HTTPStatus.INTERNAL_SERVER_ERROR
+        or status == HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a failing host.
+
+    After ``threshold`` consecutive failures the circuit opens, and requests
+    are refused without contacting the host. Once the cooldown has passed a
+    single trial request is let through. If it succeeds the circuit closes
+    again, otherwise it reopens with twice the cooldown, up to
+    ``max_cooldown`` seconds.
+    """
+
+    def __init__(self, threshold=3, cooldown=5, max_cooldown=300):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._failures = 0
+        self._opened = 0
+        self._until = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def retry_after(self):
+        """Seconds until the next trial request is let through."""
+        return max(0, self._until - time.monotonic())
+
+    def allow(self):
+        with self._lock:
+            if self._failures < self.threshold:
+                return True
+            if self._trial or time.monotonic() < self._until:
+                return False
+            self._trial = True
+            return True
+
+    def success(self):
+        with self._lock:
+            if self._opened:
+                logger.info("Server is responding again")
+            self._failures = self._opened = 0
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial = False
+            if self._failures < self.threshold:
+                return
+            cooldown = min(self.cooldown * 2**self._opened, self.max_cooldown)
+            self._opened += 1
+            self._until = time.monotonic() + cooldown
+            logger.warning(
+                f"Server failed {self._failures} times in a row, "
+                f"pausing requests for {cooldown}s"
+            )
+
+
+class HttpTransport:
+    """
+    Keep-alive HTTP(S) connections, pooled per host.
+
+    Idle connections are reused by later requests to the same host, so only
+    the first request pays for the TCP and TLS handshakes. No more than
+    ``max_connections`` requests to one host run at a time. Every request is
+    bounded by a connect and a read timeout, and GETs failing with a
+    connection error or a temporary server error are retried a few times
+    with exponential backoff. Hosts that keep failing are given a rest by a
+    circuit breaker.
+
+    Unless ``compress`` is false, responses are requested gzip or deflate
+    compressed. Their content is returned as received, see
+    :func:`decompress`.
+    """
+
+    retry_statuses = frozenset(
+        {
+            HTTPStatus.BAD_GATEWAY,
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            HTTPStatus.GATEWAY_TIMEOUT,
+        }
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        connect_timeout=5,
+        read_timeout=15,
+        retries=2,
+        backoff=0.5,
+        max_idle=4,
+        max_connections=4,
+        proxy=None,
+        user_agent=None,
+        breaker_threshold=3,
+        breaker_cooldown=5,
+        compress=True,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_idle = max_idle
+        self.max_connections = max_connections
+        self.proxy = proxy
+        self.user_agent = user_agent
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.compress = compress
+        self._idle = {}
+        self._limits = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        headers = dict(headers or {})
+        if self.user_agent:
+            headers.setdefault("User-Agent", self.user_agent)
+        if self.compress:
+            headers.setdefault("Accept-Encoding", "gzip, deflate")
+
+        breaker = self._breaker(key)
+        if not breaker.allow():
+            msg = (
+                f"Too many failed requests to {parts.hostname}, "
+                f"retrying in {breaker.retry_after:.0f}s"
+            )
+            raise CircuitOpenError(msg)
+        try:
+            response = self._get(url, key, target, headers)
+        except Exception:
+            breaker.failure()
+            raise
+        if is_transient(response.status):
+            breaker.failure()
+        else:
+            breaker.success()
+        return response
+
+    def _get(self, url, key, target, headers):
+        attempt = 0
+        while True:
+            try:
+                response, content = self._request(key, target, headers)
+            except (OSError, http.client.HTTPException) as exc:
+                if attempt >= self.retries:
+                    raise
+                logger.debug(f"Retrying {url!r} after error: {exc}")
+            else:
+                if (
+                    response.status not in self.retry_statuses
+                    or attempt >= self.retries
+                ):
+                    return HttpResponse(response.status, response.headers, content)
+                logger.debug(f"Retrying {url!r} after HTTP {response.status}")
+            self._sleep(attempt)
+            attempt += 1
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _request(self, key, target, headers):
+        with self._limit(key):
+            while True:
+                conn = self._acquire(key)
+                reused = conn.sock is not None
+                try:
+                    if not reused:
+                        conn.connect()
+                        conn.sock.settimeout(self.read_timeout)
+                    conn.request("GET", target, headers=headers)
+                    response = conn.getresponse()
+                    content = response.read()
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    if reused:
+                        # The server closed the idle connection; try another.
+                        continue
+                    raise
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._release(key, conn)
+                return response, content
+
+    def _limit(self, key):
+        with self._lock:
+            limit = self._limits.get(key)
+            if limit is None:
+                limit = self._limits[key] = threading.BoundedSemaphore(
+                    self.max_connections
+                )
+        return limit
+
+    def _breaker(self, key):
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(
+                    self.breaker_threshold, self.breaker_cooldown
+                )
+        return breaker
+
+    def _acquire(self, key):
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop()
+        return self._connection(*key)
+
+    def _release(self, key, conn):
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _connection(self, scheme, host, port):
+        conn_class = (
+            http.client.HTTPSConnection
+            if scheme == "https"
+            else http.client.HTTPConnection
+        )
+        proxy = self.proxy or urllib.request.getproxies().get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return conn_class(host, port, timeout=self.connect_timeout)
+        proxy_parts = urllib.parse.urlsplit(proxy)
+        if not proxy_parts.hostname:
+            logger.warning(f"Ignoring proxy {proxy!r} without a host name")
+            return conn_class(host, port, timeout=self.connect_timeout)
+
+        # Tunnel through the proxy. Plain HTTP is tunneled as well, so the
+        # request target stays the same for both schemes.
+        conn = conn_class(
+            proxy_parts.hostname, proxy_parts.port, timeout=self.connect_timeout
+        )
+        tunnel_headers = {}
+        if proxy_parts.username:
+            credentials = f"{proxy_parts.username}:{proxy_parts.password or ''}"
+            token = base64.b64encode(credentials.encode()).decode()
+            tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+        conn.set_tunnel(host, port, headers=tunnel_headers)
+        return conn
+
+    def _sleep(self, attempt):
+        time.sleep(self.backoff * 2**attempt)
@@ -0,0 +1,24 @@
+import tornado.web
+
+from mopidy_orfradio.metrics import METRICS
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    """
+    Serves the metrics as JSON, or in the Prometheus text format when
+    requested with ``?format=prometheus``.
+    """
+
+    def initialize(self, metrics):
+        self.metrics = metrics
+
+    def get(self):
+        if self.get_argument("format", "json") == "prometheus":
+            self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.write(self.metrics.prometheus())
+        else:
+            self.write(self.metrics.snapshot())
+
+
+def factory(config, core):  # noqa: ARG001
+    return [("/metrics", MetricsHandler, {"metrics": METRICS})]
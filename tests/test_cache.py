@@ -0,0 +1,249 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from mopidy_orfradio.cache import (
+    CacheEntry,
+    DiskCache,
+    MemoryCache,
+    SqliteCache,
+    sizeof,
+)
+from mopidy_orfradio.client import OnAir
+
+
+class MemoryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryCache()
+
+    def test_get_missing(self):
+        assert self.cache.get("a") is None
+        assert self.cache.get("a", "default") == "default"
+
+    @patch("time.monotonic")
+    def test_ttl(self, monotonic):
+        monotonic.return_value = 1000
+        self.cache.set("short", 1, ttl=60)
+        self.cache.set("long", 2, ttl=3600)
+        self.cache.set("forever", 3)
+
+        monotonic.return_value = 1100
+
+        assert self.cache.get("short") is None
+        assert self.cache.get("long") == 2
+        assert self.cache.get("forever") == 3
+
+    @patch("time.monotonic")
+    def test_peek_stale(self, monotonic):
+        self.cache.max_stale = 600
+        monotonic.return_value = 1000
+        self.cache.set("a", 1, ttl=60)
+        self.cache.set("forever", 2)
+
+        assert self.cache.peek("a") == (1, True)
+        assert self.cache.peek("forever") == (2, True)
+        assert self.cache.peek("missing", "default") == ("default", False)
+
+        monotonic.return_value = 1100
+        assert self.cache.peek("a") == (1, False)
+        assert self.cache.get("a") is None
+
+        monotonic.return_value = 1700
+        assert self.cache.peek("a") == (None, False)
+
+    def test_invalidate(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+
+        self.cache.invalidate(lambda key: key == "a")
+        assert self.cache.get("a") is None
+        assert self.cache.get("b") == 2
+
+        self.cache.invalidate()
+        assert self.cache.get("b") is None
+
+    def test_max_size(self):
+        cache = MemoryCache(max_size=10)
+        cache.set("a", 1, size=4)
+        cache.set("b", 2, size=4)
+        cache.get("a")
+        cache.set("c", 3, size=4)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.size == 8
+
+    def test_max_size_keep(self):
+        cache = MemoryCache(max_size=10, keep=lambda key: key == "a")
+        cache.set("a", 1, size=4)
+        cache.set("b", 2, size=4)
+        cache.set("c", 3, size=4)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+        cache.set("a", 1, size=12)
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+    def test_size(self):
+        self.cache.set("a", 1, size=4)
+        self.cache.set("a", 2, size=6)
+        self.cache.set("b", 3, size=1)
+        assert self.cache.size == 7
+
+        self.cache.invalidate(lambda key: key == "a")
+        assert self.cache.size == 1
+        self.cache.invalidate()
+        assert self.cache.size == 0
+
+
+class SizeofTest(unittest.TestCase):
+    def test_containers(self):
+        text = "x" * 1000
+        assert sizeof(text) == sys.getsizeof(text)
+        assert sizeof([text]) == sys.getsizeof([text]) + sys.getsizeof(text)
+        assert sizeof({"a": (text,)}) > sizeof([text])
+
+    def test_shared_counted_once(self):
+        text = "x" * 1000
+        assert sizeof([text, text]) == sys.getsizeof([text, text]) + sizeof(text)
+
+    def test_slots(self):
+        on_air = OnAir(title="x" * 1000, moderator="", until=None)
+        assert sizeof(on_air) == sys.getsizeof(on_air) + sum(
+            sizeof(value) for value in ("x" * 1000, "", None)
+        )
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_missing(self):
+        assert self.cache.get("https://example.com/") is None
+
+    def test_set_and_get(self):
+        self.cache.set(
+            CacheEntry(
+                "https://example.com/",
+                "Ö1".encode(),
+                etag='"abc"',
+                last_modified="Mon, 12 Apr 2021 05:00:00 GMT",
+            )
+        )
+
+        entry = self.cache.get("https://example.com/")
+
+        assert entry.text == "Ö1"
+        assert entry.validators() == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 12 Apr 2021 05:00:00 GMT",
+        }
+
+    def test_touch(self):
+        self.cache.set(CacheEntry("https://example.com/", b"{}", fetched=0))
+        entry = self.cache.get("https://example.com/")
+        assert entry.age > 300
+
+        self.cache.touch(entry)
+
+        assert self.cache.get("https://example.com/").age < 300
+
+    def test_expire(self):
+        self.cache.set(CacheEntry("https://example.com/a", b"{}"))
+        self.cache.set(CacheEntry("https://example.com/b", b"{}"))
+
+        self.cache.expire(lambda url: url.endswith("a"))
+
+        assert self.cache.get("https://example.com/a").age > 300
+        assert self.cache.get("https://example.com/a").text == "{}"
+        assert self.cache.get("https://example.com/b").age < 300
+
+    def test_prune(self):
+        self.cache.set(CacheEntry("https://example.com/a", b"{}"))
+        self.cache.set(CacheEntry("https://example.com/b", b"{}"))
+        self.make_unused("https://example.com/a", 8 * 24 * 60 * 60)
+
+        self.cache.prune()
+
+        assert self.cache.get("https://example.com/a") is None
+        assert self.cache.get("https://example.com/b") is not None
+        assert list(self.cache.urls()) == ["https://example.com/b"]
+
+    def test_prune_keeps_expired(self):
+        self.cache.set(CacheEntry("https://example.com/", b"{}"))
+
+        self.cache.expire()
+        self.cache.prune()
+
+        assert self.cache.get("https://example.com/").text == "{}"
+
+    def test_pruned_on_set(self):
+        self.cache.set(CacheEntry("https://example.com/a", b"{}"))
+        self.make_unused("https://example.com/a", 8 * 24 * 60 * 60)
+        self.cache._next_prune = 0  # noqa: SLF001
+
+        self.cache.set(CacheEntry("https://example.com/b", b"{}"))
+
+        assert self.cache.get("https://example.com/a") is None
+
+    def make_unused(self, url, seconds):
+        past = time.time() - seconds
+        os.utime(self.cache._path(url), (past, past))  # noqa: SLF001
+
+    def test_corrupt_entry(self):
+        self.cache.set(CacheEntry("https://example.com/", b"{}"))
+        self.cache._path("https://example.com/").write_bytes(b"garbage")  # noqa: SLF001
+
+        assert self.cache.get("https://example.com/") is None
+
+
+class SqliteCacheTest(DiskCacheTest):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "cache.sqlite"
+        self.cache = SqliteCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_shared(self):
+        other = SqliteCache(self.path)
+        self.cache.set(CacheEntry("https://example.com/", b"{}", etag='"abc"'))
+
+        entry = other.get("https://example.com/")
+        other.expire()
+
+        assert entry.text == "{}"
+        assert entry.etag == '"abc"'
+        assert self.cache.get("https://example.com/").age > 300
+        other.close()
+
+    def make_unused(self, url, seconds):
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "UPDATE responses SET used = ? WHERE url = ?",
+                (time.time() - seconds, url),
+            )
+        conn.close()
+
+    def test_corrupt_entry(self):
+        self.cache.set(CacheEntry("https://example.com/", b"{}"))
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("DROP TABLE responses")
+
+        assert self.cache.get("https://example.com/") is None
+        self.cache.set(CacheEntry("https://example.com/", b"{}"))
+        assert list(self.cache.urls()) == []
@@ -1,7 +1,27 @@
+import datetime as dt
+import gzip
+import json
+import tempfile
+import threading
 import unittest
+from email.message import Message
 from pathlib import Path
+from unittest.mock import Mock
 
-from mopidy_orfradio.client import ORFClient
+import pytest
+
+from mopidy_orfradio import TZ
+from mopidy_orfradio.cache import SqliteCache, sizeof
+from mopidy_orfradio.client import (
+    HttpClient,
+    Item,
+    OnAir,
+    ORFClient,
+    Stream,
+    _parse_archive,
+)
+from mopidy_orfradio.metrics import METRICS
+from mopidy_orfradio.transport import CircuitOpenError, HttpResponse
 
 DATA_DIR = Path(__file__).parent / "data"
 
@@ -29,8 +49,57 @@ class HttpClientMock:
             ),
         }
 
-    def get(self, url):
-        return self.url_mappings[url].read_text()
+    def get(self, url, ttl=None, parse=None, endpoint=None):
+        content = self.url_mappings[url].read_text()
+        return parse(content) if parse else content
+
+
+class ORFClientRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.http_client = Mock()
+        self.orf_client = ORFClient(self.http_client)
+        self.urls = [
+            "https://audioapi.orf.at/oe1/json/2.0/broadcasts/",
+            "https://audioapi.orf.at/oe1/api/json/4.0/broadcast/475617/20170604",
+            "https://audioapi.orf.at/oe1/api/json/4.0/broadcast/475618/20170604",
+            "https://audioapi.orf.at/oe1/api/json/4.0/broadcast/594692/20200406",
+            "https://audioapi.orf.at/fm4/json/2.0/broadcasts/",
+            "https://audioapi.orf.at/fm4/api/json/4.0/broadcast/4UP/20200409",
+        ]
+
+    def invalidated(self):
+        (predicate,) = self.http_client.invalidate.call_args[0]
+        return [url for url in self.urls if predicate(url)]
+
+    def test_refresh_all(self):
+        self.orf_client.refresh()
+
+        self.http_client.refresh.assert_called_once_with()
+
+    def test_refresh_station(self):
+        self.orf_client.refresh("oe1")
+
+        assert self.invalidated() == self.urls[:4]
+
+    def test_refresh_day(self):
+        self.orf_client.refresh("oe1", "20170604")
+
+        assert self.invalidated() == self.urls[:3]
+
+    def test_refresh_show(self):
+        self.orf_client.refresh("oe1", "20170604", "475618")
+
+        assert self.invalidated() == self.urls[2:3]
+
+    def test_record_ttl(self):
+        self.http_client.get.return_value = None
+        today = dt.datetime.now(tz=TZ).strftime("%Y%m%d")
+
+        self.orf_client.get_item_url("oe1", "oe1", "20170604", "475617", "1")
+        self.orf_client.get_item_url("oe1", "oe1", today, "475617", "1")
+
+        ttls = [call.kwargs["ttl"] for call in self.http_client.get.call_args_list]
+        assert ttls == [ORFClient.past_day_ttl, ORFClient.today_ttl]
 
 
 class ORFClientTest(unittest.TestCase):
@@ -40,40 +109,122 @@ class ORFClientTest(unittest.TestCase):
 
     def test_get_day(self):
         day = self.orf_client.get_day("oe1", "20170604")
-        day = day[:1]  # only test against first show
+        show = day[0]  # only test against first show
+
+        assert (show.id, show.title, show.time) == ("475617", "Nachrichten", "10:59")
+
+    def test_get_day_unknown_day(self):
+        assert self.orf_client.get_day("oe1", "20170101") == []
+
+    def test_get_day_hides_future_broadcasts(self):
+        now = dt.datetime.now(tz=TZ)
+        broadcasts = [
+            {
+                "programKey": key,
+                "title": key,
+                "isBroadcasted": start < now,
+                "startISO": start.isoformat(),
+                "scheduledISO": start.isoformat(),
+            }
+            for key, start in [
+                ("past", now - dt.timedelta(hours=1)),
+                ("future", now + dt.timedelta(hours=1)),
+            ]
+        ]
+        content = json.dumps([{"day": 20170604, "broadcasts": broadcasts}])
+        http_client = Mock()
+        http_client.get.side_effect = lambda url, ttl, parse, endpoint: parse(content)
+        orf_client = ORFClient(http_client)
 
-        assert day == [{"id": "475617", "title": "Nachrichten", "time": "10:59"}]
+        day = orf_client.get_day("oe1", "20170604")
+
+        assert [show.id for show in day] == ["past"]
+
+    def test_get_on_air(self):
+        now = dt.datetime.now(tz=TZ).replace(microsecond=0)
+        starts = {
+            "earlier": now - dt.timedelta(hours=2),
+            "current": now - dt.timedelta(hours=1),
+            "next": now + dt.timedelta(hours=1),
+            "later": now + dt.timedelta(hours=2),
+        }
+        broadcasts = [
+            {
+                "programKey": key,
+                "title": key,
+                "isBroadcasted": start < now,
+                "startISO": start.isoformat(),
+                "scheduledISO": start.isoformat(),
+            }
+            for key, start in starts.items()
+        ]
+        content = json.dumps([{"day": 20170604, "broadcasts": broadcasts}])
+        record = (DATA_DIR / "broadcast594692.json").read_text()
+        http_client = Mock()
+        http_client.get.side_effect = lambda url, ttl, parse, endpoint: parse(
+            content if endpoint == "archive" else record
+        )
+        orf_client = ORFClient(http_client)
+
+        on_air = orf_client.get_on_air("oe1")
+
+        assert on_air == OnAir(
+            title="Radiokolleg - Wer ist Opfer?",
+            moderator="Johannes Gelich",
+            until=starts["next"],
+        )
+        assert http_client.get.call_args.args[0].endswith("/current/20170604")
+
+    def test_get_on_air_no_record(self):
+        http_client = Mock()
+        http_client.get.side_effect = lambda url, ttl, parse, endpoint: (
+            parse((DATA_DIR / "broadcasts.json").read_text())
+            if endpoint == "archive"
+            else None
+        )
+        orf_client = ORFClient(http_client)
+
+        on_air = orf_client.get_on_air("oe1")
+
+        assert on_air.moderator == ""
+        assert on_air.until is None
 
     def test_get_show(self):
         show = self.orf_client.get_show("oe1", "20170604", "475617")
 
         assert show == [
-            {
-                "id": "1496566789000",
-                "title": "Nachrichten",
-                "time": "2017-06-04T10:59:49+02:00",
-                "artist": "",
-                "length": 188000,
-                "show_long": "Nachrichten",
-                "show_date": "Sun 2017-06-04",
-                "type": "N",
-            }
+            Item(
+                id="1496566789000",
+                title="Nachrichten",
+                time="2017-06-04T10:59:49+02:00",
+                artist="",
+                length=188000,
+                show_long="Nachrichten",
+                show_date="Sun 2017-06-04",
+                type="N",
+                stream=Stream(
+                    1496566789000, "2017-06-04_1059_tl_51_7DaysSun13_377761.mp3"
+                ),
+            )
         ]
 
     def test_get_show_no_subitems(self):
         show = self.orf_client.get_show("oe1", "20200406", "594692")
 
         assert show == [
-            {
-                "id": "1586156702000",
-                "title": "Radiokolleg - Wer ist Opfer?",
-                "time": "2020-04-06T09:05:02+02:00",
-                "artist": "Johannes Gelich",
-                "length": 1446000,
-                "show_long": "Radiokolleg - Wer ist Opfer?",
-                "show_date": "Mon 2020-04-06",
-                "type": "",
-            }
+            Item(
+                id="1586156702000",
+                title="Radiokolleg - Wer ist Opfer?",
+                time="2020-04-06T09:05:02+02:00",
+                artist="Johannes Gelich",
+                length=1446000,
+                show_long="Radiokolleg - Wer ist Opfer?",
+                show_date="Mon 2020-04-06",
+                type="",
+                stream=Stream(
+                    1586156702000, "2020-04-06_0905_tl_51_7DaysMon13_1233135.mp3"
+                ),
+            )
         ]
 
     def test_get_show_zeroth_item(self):
@@ -81,33 +232,153 @@ class ORFClientTest(unittest.TestCase):
         show = self.orf_client.get_show("oe1", "20210412", "635031")
 
         assert show == [
-            {
-                "artist": "",
-                "id": "1618203591000-1618203675000",
-                "length": 84000,
-                "show_long": "Ö1 Morgenjournal",
-                "show_date": "Mon 2021-04-12",
-                "time": "2021-04-12T06:59:51+02:00",
-                "title": "ohne Namen",
-                "type": "S",
-            }
+            Item(
+                artist="",
+                id="1618203591000-1618203675000",
+                length=84000,
+                show_long="Ö1 Morgenjournal",
+                show_date="Mon 2021-04-12",
+                time="2021-04-12T06:59:51+02:00",
+                title="ohne Namen",
+                type="S",
+                stream=Stream(
+                    1618203591000, "2021-04-12_0659_tl_51_7DaysMon6_1514313.mp3"
+                ),
+            )
+        ]
+
+    def test_get_show_shares_strings(self):
+        self.orf_client.media_types += ["S"]
+        items = self.orf_client.get_show("fm4", "20200409", "4UP")
+
+        assert all(item.show_long is items[0].show_long for item in items)
+        assert all(item.show_date is items[0].show_date for item in items)
+
+    def test_keep(self):
+        keep = self.http_client_mock.keep
+        record_url = (
+            "https://audioapi.orf.at/oe1/api/json/4.0/broadcast/475617/20170604"
+        )
+
+        assert keep("https://audioapi.orf.at/oe1/json/2.0/broadcasts/")
+        assert not keep(record_url)
+        self.orf_client.set_current_show("oe1", "20170604", "475617")
+        assert keep(record_url)
+
+    def test_get_shows(self):
+        shows = self.orf_client.get_shows(
+            [("oe1", "20200406", "594692"), ("oe1", "20170604", "475617")]
+        )
+
+        assert [[item.id for item in items] for items in shows] == [
+            ["1586156702000"],
+            ["1496566789000"],
         ]
 
+    def test_get_days(self):
+        days = self.orf_client.get_days([("oe1", "20170604"), ("oe1", "20170101")])
+
+        assert [len(shows) for shows in days] == [2, 0]
+
+    def test_get_shows_failure(self):
+        shows = self.orf_client.get_shows(
+            [("oe1", "20200406", "594692"), ("oe1", "20200406", "unknown")]
+        )
+
+        assert len(shows[0]) == 1
+        assert shows[1] == []
+
+    def test_get_shows_deadline(self):
+        release = threading.Event()
+        http_client = Mock()
+        http_client.get.side_effect = lambda *args, **kwargs: release.wait()
+        orf_client = ORFClient(http_client)
+
+        shows = orf_client.get_shows([("oe1", "20200406", "594692")], timeout=0.01)
+
+        assert shows == [None]
+        release.set()
+        orf_client.close()
+
+    def test_close_during_get_shows(self):
+        started = threading.Event()
+        release = threading.Event()
+        http_client = Mock()
+
+        def get(*args: object, **kwargs: object) -> None:
+            started.set()
+            release.wait()
+
+        http_client.get.side_effect = get
+        http_client.close.side_effect = release.set
+        orf_client = ORFClient(http_client)
+        shows = [("oe1", "20200406", str(i)) for i in range(20)]
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.extend(orf_client.get_shows(shows)), daemon=True
+        )
+        thread.start()
+        started.wait(timeout=1)
+
+        orf_client.close()
+        thread.join(timeout=1)
+
+        assert not thread.is_alive()
+        assert result == [[]] * 20
+        assert http_client.get.call_count < 20
+
     def test_get_item_broken_unicode(self):
         show = self.orf_client.get_item(
             "fm4", "20200409", "4UP", "1586420063000-1586420268000"
         )
 
-        assert show == {
-            "artist": "",
-            "id": "1586420063000-1586420264000",
-            "length": 201000,
-            "show_long": "Stay At Home, Baby!",
-            "show_date": "Thu 2020-04-09",
-            "time": "2020-04-09T10:14:23+02:00",
-            "title": "Joseph Gordon Levitts Platttform HitRecord",
-            "type": "B",
-        }
+        assert show == Item(
+            artist="",
+            id="1586420063000-1586420264000",
+            length=201000,
+            show_long="Stay At Home, Baby!",
+            show_date="Thu 2020-04-09",
+            time="2020-04-09T10:14:23+02:00",
+            title="Joseph Gordon Levitts Platttform HitRecord",
+            type="B",
+            stream=Stream(1586419207000, "2020-04-09_1000_tl_54_7DaysThu6_96335.mp3"),
+        )
+
+    def test_get_item_zeroth_item(self):
+        self.orf_client.media_types += ["S"]
+        item = self.orf_client.get_item(
+            "oe1", "20210412", "635031", "1618203591000-1618203675000"
+        )
+
+        assert item.title == "ohne Namen"
+        assert item.length == 84000
+
+    def test_get_item_whole_show(self):
+        item = self.orf_client.get_item("oe1", "20200406", "594692", "1586156702000")
+
+        assert item.title == "Radiokolleg - Wer ist Opfer?"
+
+    def test_get_item_missing(self):
+        item = self.orf_client.get_item("fm4", "20200409", "4UP", "1586420063001")
+
+        assert item is None
+
+    def test_get_item_url_later_stream(self):
+        url = self.orf_client.get_item_url(
+            "fm4", "fm4", "20200409", "4UP", "1586424895000-1586425111000"
+        )
+
+        assert (
+            url
+            == "https://loopstream01.apa.at/?channel=fm4&shoutcast=0&id=2020-04-09_1134_tl_54_7DaysThu8_96341.mp3&offset=1000&offsetende=217000"
+        )
+
+    def test_get_item_url_open_ended(self):
+        url = self.orf_client.get_item_url(
+            "wie", "oe2w", "20200615", "WXWOW", "1592222374000"
+        )
+
+        assert url.endswith("&offset=0&offsetende=")
 
     def test_get_item_url_oe2(self):
         url = self.orf_client.get_item_url(
@@ -118,3 +389,312 @@ class ORFClientTest(unittest.TestCase):
             url
             == "https://loopstream01.apa.at/?channel=oe2w&shoutcast=0&id=2020-06-15_1359_tl_61_7DaysMon7_289462.mp3&offset=0&offsetende=181000"
         )
+
+    def test_get_stream_url(self):
+        item = self.orf_client.get_item(
+            "fm4", "20200409", "4UP", "1586424895000-1586425111000"
+        )
+        url = self.orf_client.get_stream_url(
+            "fm4", "1586424895000-1586425111000", item.stream.start, item.stream.id
+        )
+
+        assert url == self.orf_client.get_item_url(
+            "fm4", "fm4", "20200409", "4UP", "1586424895000-1586425111000"
+        )
+
+    def test_get_stream_url_quoted(self):
+        url = self.orf_client.get_stream_url("oe1", "1000", 0, "a&channel=evil")
+
+        assert url == (
+            "https://loopstream01.apa.at/?channel=oe1&shoutcast=0"
+            "&id=a%26channel%3Devil&offset=1000&offsetende="
+        )
+
+
+class ParseArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.content = (DATA_DIR / "broadcasts.json").read_text()
+
+    def test_layout_does_not_matter(self):
+        compact = json.dumps(json.loads(self.content), separators=(",", ":"))
+
+        assert _parse_archive(compact) == _parse_archive(self.content)
+
+    def test_days(self):
+        archive = _parse_archive(self.content)
+
+        day = archive["20170604"]
+        assert day.label == "Sun 2017-06-04"
+        assert day.broadcasts[0].start == dt.datetime(2017, 6, 4, 10, 59, 49, tzinfo=TZ)
+
+    def test_empty(self):
+        assert _parse_archive(" [ ] ") == {}
+
+    def test_invalid(self):
+        for content in ["", "{}", "[", '[{"day": 20170604, "broadcasts": []} {}]']:
+            with pytest.raises(ValueError, match="Expecting"):
+                _parse_archive(content)
+
+
+def _response(status, content=b"", headers=()):
+    message = Message()
+    message["Content-Type"] = "application/json; charset=utf-8"
+    for name, value in headers:
+        message[name] = value
+    return HttpResponse(status, message, content)
+
+
+class HttpClientTest(unittest.TestCase):
+    url = "https://audioapi.orf.at/oe1/json/2.0/broadcasts/"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.transport = Mock()
+        self.transport.get.return_value = _response(200, b"[]", [("ETag", '"v1"')])
+        self.http_client = HttpClient(
+            cache_dir=self.tmp_dir.name, transport=self.transport
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_stores_validators(self):
+        assert self.http_client.get(self.url) == "[]"
+
+        entry = self.http_client.disk_cache.get(self.url)
+        assert entry.validators() == {"If-None-Match": '"v1"'}
+
+    def test_get_compressed(self):
+        content = gzip.compress(b"[1]")
+        self.transport.get.return_value = _response(
+            200, content, [("Content-Encoding", "gzip")]
+        )
+
+        assert self.http_client.get(self.url) == "[1]"
+        entry = self.http_client.disk_cache.get(self.url)
+        assert entry.content == content
+        assert entry.text == "[1]"
+
+    def test_get_invalid_compressed(self):
+        self.transport.get.return_value = _response(
+            200, b"[1]", [("Content-Encoding", "gzip")]
+        )
+
+        assert self.http_client.get(self.url) is None
+        assert self.http_client.disk_cache.get(self.url) is None
+
+    def test_get_max_size(self):
+        self.http_client.cache.max_size = 2 * sizeof("[]") + 1
+        other_url = self.url.replace("oe1", "fm4")
+        self.http_client.get(self.url)
+        self.http_client.get(other_url)
+        self.http_client.get(self.url)
+
+        assert self.http_client.cache.size == 2 * sizeof("[]")
+        self.http_client.get(self.url.replace("oe1", "oe3"))
+        assert self.http_client.cache.get(self.url) == "[]"
+        assert self.http_client.cache.get(other_url) is None
+
+    def test_get_size_of_parsed_value(self):
+        value = self.http_client.get(self.url, parse=lambda text: ["x" * 1000])
+
+        assert self.http_client.cache.size == sizeof(value) > 1000
+
+    def test_get_from_shared_cache(self):
+        path = Path(self.tmp_dir.name) / "shared.sqlite"
+        http_client = HttpClient(disk_cache=SqliteCache(path), transport=self.transport)
+        other = HttpClient(disk_cache=SqliteCache(path), transport=self.transport)
+
+        assert http_client.get(self.url) == "[]"
+        assert other.get(self.url) == "[]"
+        self.transport.get.assert_called_once()
+        http_client.close()
+        other.close()
+
+    def test_get_fresh_from_disk(self):
+        self.http_client.get(self.url)
+        self.http_client.cache.invalidate()
+
+        assert self.http_client.get(self.url) == "[]"
+        self.transport.get.assert_called_once()
+
+    def test_get_revalidates_stale_entry(self):
+        self.http_client.get(self.url)
+        self.http_client.cache.invalidate()
+        entry = self.http_client.disk_cache.get(self.url)
+        entry.fetched = 0
+        self.http_client.disk_cache.set(entry)
+        self.transport.get.return_value = _response(304)
+
+        assert self.http_client.get(self.url) == "[]"
+
+        self.transport.get.assert_called_with(
+            self.url, headers={"If-None-Match": '"v1"'}
+        )
+        assert self.http_client.disk_cache.get(self.url).age < 300
+
+    def test_get_memory_cache(self):
+        self.http_client.get(self.url)
+
+        assert self.http_client.get(self.url) == "[]"
+        self.transport.get.assert_called_once()
+
+    def test_get_parses_once(self):
+        parse = Mock(return_value=[])
+
+        assert self.http_client.get(self.url, parse=parse) == []
+        assert self.http_client.get(self.url, parse=parse) == []
+
+        parse.assert_called_once_with("[]")
+
+    def test_get_single_flight(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def get(url, headers=None):
+            started.set()
+            release.wait(timeout=5)
+            return _response(200, b"[]")
+
+        self.transport.get.side_effect = get
+        parse = Mock(return_value=[])
+        results = []
+
+        def fetch():
+            results.append(self.http_client.get(self.url, parse=parse))
+
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        threads[0].start()
+        started.wait(timeout=5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert results == [[], [], [], []]
+        self.transport.get.assert_called_once()
+        parse.assert_called_once_with("[]")
+        assert self.http_client._pending == {}  # noqa: SLF001
+
+    def test_get_single_flight_error(self):
+        with pytest.raises(ValueError, match="Invalid URL"):
+            self.http_client.get("ftp://example.com/")
+        assert self.http_client._pending == {}  # noqa: SLF001
+
+    def test_get_stale_while_revalidate(self):
+        self.http_client.cache.max_stale = 600
+        self.http_client.get(self.url, ttl=0)
+        self.transport.get.return_value = _response(200, b"[1]")
+
+        assert self.http_client.get(self.url, ttl=0) == "[]"
+        self._wait_for_pending()
+
+        assert self.transport.get.call_count == 2
+        assert self.http_client.cache.peek(self.url) == ("[1]", False)
+
+    def test_get_stale_after_failed_revalidation(self):
+        self.http_client.disk_cache = None
+        self.http_client.cache.max_stale = 600
+        self.http_client.get(self.url, ttl=0)
+        self.transport.get.return_value = _response(500)
+
+        assert self.http_client.get(self.url, ttl=0) == "[]"
+        self._wait_for_pending()
+
+        assert self.http_client.cache.peek(self.url) == ("[]", False)
+
+    def test_get_too_stale(self):
+        self.http_client.get(self.url, ttl=0)
+        self.transport.get.return_value = _response(200, b"[1]")
+
+        assert self.http_client.get(self.url, ttl=0) == "[1]"
+
+    def test_get_stale_revalidation_error(self):
+        self.http_client.cache.max_stale = 600
+        self.http_client.get(self.url, ttl=0)
+        self.http_client.disk_cache = Mock()
+        self.http_client.disk_cache.get.side_effect = OSError("Disk failure")
+
+        with self.assertLogs("mopidy_orfradio.client", "ERROR") as logs:
+            assert self.http_client.get(self.url, ttl=0) == "[]"
+            self._wait_for_pending()
+
+        assert "Error refetching" in logs.output[0]
+        assert self.http_client.cache.peek(self.url) == ("[]", False)
+        assert self.http_client._pending == {}  # noqa: SLF001
+
+    def _wait_for_pending(self):
+        self.http_client._revalidator.shutdown(wait=True)  # noqa: SLF001
+
+    def test_get_negative_cache(self):
+        self.transport.get.return_value = _response(404)
+
+        assert self.http_client.get(self.url) is None
+        assert self.http_client.get(self.url) is None
+
+        self.transport.get.assert_called_once()
+        assert self.http_client.cache.peek(self.url) == (None, True)
+
+    def test_get_transient_error_not_cached(self):
+        self.transport.get.return_value = _response(503)
+
+        assert self.http_client.get(self.url) is None
+        self.transport.get.return_value = _response(200, b"[]")
+        assert self.http_client.get(self.url) == "[]"
+
+        assert self.transport.get.call_count == 2
+
+    def test_get_last_known_good(self):
+        self.http_client.get(self.url, ttl=0)
+        self.http_client.cache.invalidate()
+        self.transport.get.side_effect = CircuitOpenError("Too many failed requests")
+
+        assert self.http_client.get(self.url, ttl=0) == "[]"
+        assert self.http_client.cache.peek(self.url) == ("[]", True)
+
+    def test_get_metrics(self):
+        METRICS.reset()
+
+        self.http_client.get(self.url, endpoint="archive")
+        self.http_client.get(self.url, endpoint="archive")
+
+        counters = {
+            (c["name"], c["labels"].get("result")): c["value"]
+            for c in METRICS.snapshot()["counters"]
+        }
+        assert counters == {
+            ("cache_requests", "miss"): 1,
+            ("cache_requests", "hit"): 1,
+            ("fetches", "ok"): 1,
+            ("received_bytes", None): 2,
+        }
+
+    def test_get_parse_error(self):
+        self.transport.get.return_value = _response(200, b"<html>")
+
+        assert self.http_client.get(self.url, parse=json.loads) is None
+
+    def test_invalidate_revalidates(self):
+        other_url = "https://audioapi.orf.at/fm4/json/2.0/broadcasts/"
+        self.http_client.get(self.url, ttl=60)
+        self.http_client.get(other_url, ttl=60)
+
+        self.http_client.invalidate(lambda url: url == self.url)
+        self.http_client.get(self.url, ttl=60)
+        self.http_client.get(other_url, ttl=60)
+
+        assert self.transport.get.call_count == 3
+        self.transport.get.assert_called_with(
+            self.url, headers={"If-None-Match": '"v1"'}
+        )
+
+    def test_get_http_error(self):
+        self.transport.get.return_value = _response(404)
+
+        assert self.http_client.get(self.url) is None
+
+    def test_get_network_error(self):
+        self.transport.get.side_effect = OSError("offline")
+
+        assert self.http_client.get(self.url) is None
@@ -0,0 +1,134 @@
+import datetime as dt
+import unittest
+from unittest.mock import Mock, patch
+
+from mopidy.models import TlTrack, Track
+
+from mopidy_orfradio import TZ
+from mopidy_orfradio.client import OnAir
+from mopidy_orfradio.frontend import ORFLiveFrontend, ORFLookaheadFrontend
+
+
+def _tl_tracks(*uris: str) -> list[TlTrack]:
+    return [
+        TlTrack(tlid=i, track=Track(uri=uri)) for i, uri in enumerate(uris, start=1)
+    ]
+
+
+class ORFLookaheadFrontendTest(unittest.TestCase):
+    def setUp(self):
+        self.core = Mock()
+        self.core.tracklist.get_tl_tracks.return_value.get.return_value = _tl_tracks(
+            "orfradio:oe1/20140914/1/1",
+            "orfradio:oe1/20140914/1/2",
+            "file:///music/song.mp3",
+            "orfradio:oe1/20140914/1/3",
+            "orfradio:oe1/20140914/1/4",
+        )
+        self.core.tracklist.index.return_value.get.return_value = 0
+        self.backend = Mock()
+        patcher = patch("pykka.ActorRegistry.get_by_class", return_value=[self.backend])
+        self.get_by_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _frontend(self, depth=3):
+        config = {"orfradio": {"lookahead_tracks": depth}}
+        return ORFLookaheadFrontend(config, self.core)
+
+    def test_track_playback_started(self):
+        self._frontend().track_playback_started(None)
+
+        self.backend.proxy().preresolve.assert_called_once_with(
+            ["orfradio:oe1/20140914/1/2", "orfradio:oe1/20140914/1/3"]
+        )
+
+    def test_tracklist_changed_not_playing(self):
+        self.core.tracklist.index.return_value.get.return_value = None
+
+        self._frontend(depth=1).tracklist_changed()
+
+        self.backend.proxy().preresolve.assert_called_once_with(
+            ["orfradio:oe1/20140914/1/1"]
+        )
+
+    def test_end_of_tracklist(self):
+        self.core.tracklist.index.return_value.get.return_value = 4
+
+        self._frontend().tracklist_changed()
+
+        self.backend.proxy().preresolve.assert_not_called()
+
+    def test_disabled(self):
+        self._frontend(depth=0).tracklist_changed()
+
+        self.core.tracklist.get_tl_tracks.assert_not_called()
+        self.backend.proxy().preresolve.assert_not_called()
+
+
+class ORFLiveFrontendTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = Mock()
+        self.on_air = OnAir(
+            title="Morgenjournal",
+            moderator="",
+            until=dt.datetime.now(tz=TZ) + dt.timedelta(minutes=10),
+        )
+        self.backend.proxy().get_on_air.return_value.get.return_value = self.on_air
+        for target, name in [
+            ("pykka.ActorRegistry.get_by_class", "get_by_class"),
+            ("mopidy_orfradio.frontend.CoreListener.send", "send"),
+            ("threading.Timer", "timer"),
+        ]:
+            patcher = patch(target)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.get_by_class.return_value = [self.backend]
+        self.frontend = ORFLiveFrontend({"orfradio": {"live_metadata": True}}, Mock())
+
+    def test_live(self):
+        self.frontend.track_playback_started(_tl_tracks("orfradio:oe1/live")[0])
+
+        self.backend.proxy().get_on_air.assert_called_with("oe1")
+        self.send.assert_called_once_with("stream_title_changed", title="Morgenjournal")
+        delay = self.timer.call_args.args[0]
+        assert 595 < delay <= 601
+        self.timer.return_value.start.assert_called_once_with()
+
+    def test_next_show(self):
+        self.frontend.track_playback_started(_tl_tracks("orfradio:oe1/live")[0])
+        self.backend.proxy().get_on_air.return_value.get.return_value = OnAir(
+            title="Pasticcio", moderator="", until=None
+        )
+
+        self.frontend.update_on_air()
+
+        self.send.assert_called_with("stream_title_changed", title="Pasticcio")
+        self.timer.return_value.cancel.assert_called_once_with()
+        assert self.timer.call_args.args[0] == ORFLiveFrontend.retry
+
+    def test_playback_ended(self):
+        self.frontend.track_playback_started(_tl_tracks("orfradio:oe1/live")[0])
+        self.frontend.track_playback_ended(None, 0)
+
+        self.timer.return_value.cancel.assert_called_once_with()
+        self.frontend.update_on_air()
+        self.send.assert_called_once()
+
+    def test_not_live(self):
+        for uri in [
+            "orfradio:oe1/20140914/1/1",
+            "orfradio:campus/live",
+            "orfradio:foo/live",
+            "file:///music/song.mp3",
+        ]:
+            self.frontend.track_playback_started(_tl_tracks(uri)[0])
+
+        self.backend.proxy().get_on_air.assert_not_called()
+        self.timer.assert_not_called()
+
+    def test_disabled(self):
+        self.frontend.enabled = False
+
+        self.frontend.track_playback_started(_tl_tracks("orfradio:oe1/live")[0])
+
+        self.send.assert_not_called()
@@ -1,11 +1,19 @@
+import dataclasses
 import datetime as dt
 import unittest
 from unittest.mock import Mock
 
-from mopidy.models import Ref
+import pytest
+from mopidy.models import Album, Artist, Ref, Track
 
 from mopidy_orfradio import TZ
-from mopidy_orfradio.library import ORFLibraryProvider, ORFLibraryUri, ORFUriType
+from mopidy_orfradio.client import Broadcast, Day, Item, OnAir, Stream
+from mopidy_orfradio.library import (
+    InvalidORFUriError,
+    ORFLibraryProvider,
+    ORFLibraryUri,
+    ORFUriType,
+)
 
 
 class ORFLibraryUriTest(unittest.TestCase):
@@ -37,6 +45,54 @@ class ORFLibraryUriTest(unittest.TestCase):
         assert result.day_id == "20140914"
         assert result.show_id == "382176"
 
+    def test_parse_item_uri(self):
+        uri = "orfradio:oe1/20140914/382176/1410674400000"
+        result = ORFLibraryUri.parse(uri)
+        assert result.uri_type == ORFUriType.ARCHIVE_ITEM
+        assert result.item_id == "1410674400000"
+        assert result.stream_id is None
+        assert result.stream_start is None
+
+    def test_parse_item_uri_with_stream(self):
+        uri = "orfradio:oe1/20140914/382176/1?stream=a.mp3&start=1410674000000"
+        result = ORFLibraryUri.parse(uri)
+        assert result.uri_type == ORFUriType.ARCHIVE_ITEM
+        assert result.item_id == "1"
+        assert result.stream_id == "a.mp3"
+        assert result.stream_start == 1410674000000
+
+    def test_parse_item_uri_with_invalid_stream(self):
+        uri = "orfradio:oe1/20140914/382176/1410674400000?stream=a.mp3&start=x"
+        result = ORFLibraryUri.parse(uri)
+        assert result.stream_id is None
+        assert result.stream_start is None
+
+    def test_parse_item_uri_with_unsafe_stream(self):
+        uri = "orfradio:oe1/20140914/382176/1?stream=a%26channel%3Devil&start=0"
+        result = ORFLibraryUri.parse(uri)
+        assert result.stream_id is None
+        assert result.stream_start is None
+
+    def test_parse_invalid_day_uri(self):
+        for uri in (
+            "orfradio:oe1/garbage",
+            "orfradio:oe1/20141399/382176",
+            "orfradio:oe1/2014091/382176/1",
+        ):
+            with pytest.raises(InvalidORFUriError):
+                ORFLibraryUri.parse(uri)
+
+    def test_parse_invalid_item_uri(self):
+        with pytest.raises(InvalidORFUriError):
+            ORFLibraryUri.parse("orfradio:oe1/20140914/382176/garbage")
+
+    def test_parse_is_shared(self):
+        uri = "orfradio:oe1/20140914/382176/1"
+        result = ORFLibraryUri.parse(uri)
+        assert ORFLibraryUri.parse(uri) is result
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.item_id = "2"
+
     def test_create_root_uri(self):
         parsed_uri = ORFLibraryUri(ORFUriType.ROOT)
         assert str(parsed_uri) == "orfradio:"
@@ -57,27 +113,61 @@ class ORFLibraryUriTest(unittest.TestCase):
         parsed_uri = ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, "oe1", "20140914", "382176")
         assert str(parsed_uri) == "orfradio:oe1/20140914/382176"
 
+    def test_create_item_uri_with_stream(self):
+        parsed_uri = ORFLibraryUri(
+            ORFUriType.ARCHIVE_ITEM,
+            "oe1",
+            "20140914",
+            "382176",
+            "1",
+            stream_id="a.mp3",
+            stream_start=1410674000000,
+        )
+        assert (
+            str(parsed_uri)
+            == "orfradio:oe1/20140914/382176/1?stream=a.mp3&start=1410674000000"
+        )
+
+
+def _item(item_id, time, title):
+    return Item(
+        id=item_id,
+        title=title,
+        time=time,
+        artist="Artist",
+        length=60000,
+        show_long="Show",
+        show_date="Sun 2014-09-14",
+        type="M",
+        stream=None,
+    )
+
+
+def _broadcast(show_id, time, title, start=None):
+    start = start or dt.datetime(2014, 9, 14, tzinfo=TZ)
+    return Broadcast(id=show_id, start=start, time=time, title=title)
+
 
 class ORFLibraryProviderTest(unittest.TestCase):
     def setUp(self):
         self.client_mock = Mock()
         self.client_mock.get_day = Mock(
             return_value=[
-                {"id": "1", "time": "01:00", "title": "Item1"},
-                {"id": "2", "time": "02:00", "title": "Item2"},
-                {"id": "3", "time": "03:00", "title": "Item3"},
+                _broadcast("1", "01:00", "Item1"),
+                _broadcast("2", "02:00", "Item2"),
+                _broadcast("3", "03:00", "Item3"),
             ]
         )
         self.client_mock.get_show = Mock(
-            return_value=[
-                {"id": "1", "time": "01:00", "title": "Item1"},
-                {"id": "2", "time": "02:00", "title": "Item2"},
-                {"id": "3", "time": "03:00", "title": "Item3"},
-            ]
+            return_value=[_item("1", "01:00", "Item1"), _item("2", "02:00", "Item2")]
         )
-        self.client_mock.get_item = Mock(
-            return_value={"id": "1", "time": "01:00", "title": "Item1"}
+        self.client_mock.get_shows = Mock(
+            side_effect=lambda shows, timeout=None: [
+                self.client_mock.get_show(*show) for show in shows
+            ]
         )
+        self.client_mock.get_item = Mock(return_value=_item("1", "01:00", "Item1"))
+        self.client_mock.get_on_air = Mock(return_value=None)
         self.backend = Mock()
         self.backend.config = {
             "orfradio": {"stations": ["oe1", "fm4"], "afterhours": False}
@@ -90,6 +180,11 @@ class ORFLibraryProviderTest(unittest.TestCase):
         result = self.library.browse(uri)
         assert result == []
 
+    def test_browse_invalid_day_uri(self):
+        result = self.library.browse("orfradio:oe1/garbage/123")
+        assert result == []
+        self.client_mock.get_show.assert_not_called()
+
     def test_browse_unbrowsable_uri(self):
         uri = str(ORFLibraryUri(ORFUriType.LIVE, "oe1"))
         result = self.library.browse(uri)
@@ -139,20 +234,186 @@ class ORFLibraryProviderTest(unittest.TestCase):
         assert result[0].uri == uri
         assert result[0].name == "Live"
 
+    def test_lookup_live_on_air(self):
+        self.client_mock.get_on_air.return_value = OnAir(
+            title="Morgenjournal", moderator="Moderator", until=None
+        )
+        uri = str(ORFLibraryUri(ORFUriType.LIVE, "oe1"))
+        result = self.library.lookup(uri)
+        self.client_mock.get_on_air.assert_called_once_with("oe1")
+        assert result == [
+            Track(
+                uri=uri,
+                name="Morgenjournal",
+                artists=[Artist(name="Moderator")],
+                album=Album(name="Ö1 Live"),
+            )
+        ]
+
+    def test_lookup_live_without_archive(self):
+        uri = str(ORFLibraryUri(ORFUriType.LIVE, "campus"))
+        result = self.library.lookup(uri)
+        self.client_mock.get_on_air.assert_not_called()
+        assert result == [Track(uri=uri, name="Live")]
+
+    def test_lookup_live_unknown_station(self):
+        uri = str(ORFLibraryUri(ORFUriType.LIVE, "foo"))
+        result = self.library.lookup(uri)
+        self.client_mock.get_on_air.assert_not_called()
+        assert result == [Track(uri=uri, name="Live")]
+
     def test_lookup_archive_day(self):
         uri = str(ORFLibraryUri(ORFUriType.ARCHIVE_DAY, "oe1", "20140914"))
         result = self.library.lookup(uri)
         self.client_mock.get_day.assert_called_once_with("oe1", "20140914")
-        assert len(result) == 3
-        assert result[0].type == Ref.DIRECTORY
-        assert result[0].uri == "orfradio:oe1/20140914/1"
-        assert result[0].name == "01:00: Item1"
+        self.client_mock.get_shows.assert_called_once_with(
+            [
+                ("oe1", "20140914", "1"),
+                ("oe1", "20140914", "2"),
+                ("oe1", "20140914", "3"),
+            ],
+            timeout=ORFLibraryProvider.lookup_timeout,
+        )
+        assert len(result) == 6
+        assert isinstance(result[0], Track)
+        assert result[0].uri == "orfradio:oe1/20140914/1/1"
+        assert result[0].name == "Item1"
+        assert result[5].uri == "orfradio:oe1/20140914/3/2"
 
     def test_lookup_archive_show(self):
         uri = str(ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, "oe1", "20140914", "1234567"))
         result = self.library.lookup(uri)
         self.client_mock.get_show.assert_called_once_with("oe1", "20140914", "1234567")
-        assert len(result) == 3
-        # this test might be wrong:
+        assert len(result) == 2
         assert result[0].uri == "orfradio:oe1/20140914/1234567/1"
-        assert result[0].name == "01:00: Item1"
+        assert result[0].name == "Item1"
+        assert result[0].artists == frozenset([Artist(name="Artist")])
+        assert result[0].album.name == "Show (Sun 2014-09-14)"
+        assert result[0].length == 60000
+
+    def test_lookup_archive_show_with_streams(self):
+        self.client_mock.get_show.return_value = [
+            dataclasses.replace(_item("1", "01:00", "Item1"), stream=Stream(0, "a.mp3"))
+        ]
+        uri = str(ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, "oe1", "20140914", "1234567"))
+        result = self.library.lookup(uri)
+        assert result[0].uri == "orfradio:oe1/20140914/1234567/1?stream=a.mp3&start=0"
+
+    def test_lookup_archive_item(self):
+        uri = str(
+            ORFLibraryUri(ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "1234567", "1")
+        )
+        result = self.library.lookup(uri)
+        self.client_mock.get_item.assert_called_once_with(
+            "oe1", "20140914", "1234567", "1"
+        )
+        assert len(result) == 1
+        assert result[0].uri == uri
+
+    def test_lookup_missing_archive_item(self):
+        self.client_mock.get_item.return_value = None
+        uri = str(
+            ORFLibraryUri(ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "1234567", "9")
+        )
+        assert self.library.lookup(uri) == []
+
+    def test_lookup_many(self):
+        uris = [
+            str(ORFLibraryUri(ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "7", "1")),
+            str(ORFLibraryUri(ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "7", "2")),
+            str(ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, "fm4", "20140914", "8")),
+            str(ORFLibraryUri(ORFUriType.LIVE, "oe1")),
+        ]
+        result = self.library.lookup_many(uris)
+        self.client_mock.get_shows.assert_called_once_with(
+            [("fm4", "20140914", "8"), ("oe1", "20140914", "7")],
+            timeout=ORFLibraryProvider.lookup_timeout,
+        )
+        assert list(result) == uris
+        assert len(result[uris[2]]) == 2
+
+    def test_lookup_many_late(self):
+        self.client_mock.get_shows.side_effect = None
+        self.client_mock.get_shows.return_value = [None, [_item("2", "02:00", "x")]]
+        uris = [
+            str(ORFLibraryUri(ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "7", "1")),
+            str(ORFLibraryUri(ORFUriType.ARCHIVE_SHOW, "oe1", "20140914", "8")),
+        ]
+        result = self.library.lookup_many(uris)
+        self.client_mock.get_item.assert_not_called()
+        self.client_mock.get_show.assert_called_once_with("oe1", "20140914", "8")
+        assert result[uris[0]] == []
+        assert len(result[uris[1]]) == 2
+
+    def test_lookup_archive_day_late(self):
+        self.client_mock.get_shows.side_effect = None
+        self.client_mock.get_shows.return_value = [
+            None,
+            None,
+            [_item("1", "01:00", "x")],
+        ]
+        uri = str(ORFLibraryUri(ORFUriType.ARCHIVE_DAY, "oe1", "20140914"))
+        result = self.library.lookup(uri)
+        assert [track.uri for track in result] == ["orfradio:oe1/20140914/3/1"]
+
+    def test_refresh_all(self):
+        self.library.refresh()
+        self.client_mock.refresh.assert_called_once_with()
+
+    def test_refresh_day(self):
+        uri = str(ORFLibraryUri(ORFUriType.ARCHIVE_DAY, "oe1", "20140914"))
+        self.library.refresh(uri)
+        self.client_mock.refresh.assert_called_once_with("oe1", "20140914")
+
+    def test_refresh_item(self):
+        uri = str(
+            ORFLibraryUri(ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "1234567", "1")
+        )
+        self.library.refresh(uri)
+        self.client_mock.refresh.assert_called_once_with("oe1", "20140914", "1234567")
+
+    def test_search_without_fetches(self):
+        result = self.library.search({"any": ["item"]})
+        assert result.tracks == ()
+        assert result.albums == ()
+        self.client_mock.get_day.assert_not_called()
+
+    def test_search_fetched_archive(self):
+        past = dt.datetime(2014, 9, 14, 6, tzinfo=TZ)
+        future = dt.datetime.now(tz=TZ) + dt.timedelta(hours=1)
+        self.library.archive_fetched(
+            "oe1",
+            {
+                "20140914": Day(
+                    id="20140914",
+                    label="Sun 2014-09-14",
+                    broadcasts=(
+                        _broadcast("1", "06:00", "Morgenjournal", past),
+                        _broadcast("2", "07:00", "Mittagsjournal", future),
+                    ),
+                )
+            },
+        )
+        result = self.library.search({"album": ["journal"]})
+        assert result.albums == (
+            Album(uri="orfradio:oe1/20140914/1", name="Morgenjournal (Sun 2014-09-14)"),
+        )
+
+        self.library.archive_fetched("oe1", {})
+        assert self.library.search({"album": ["journal"]}).albums == ()
+
+    def test_search_fetched_show(self):
+        show = Mock()
+        show.items_for.return_value = [
+            dataclasses.replace(_item("1", "01:00", "Item1"), artist="Interpreter")
+        ]
+        self.library.show_fetched("oe1", "20140914", "1234567", show)
+
+        result = self.library.search({"artist": ["interp"]}, uris=["orfradio:oe1"])
+        assert len(result.tracks) == 1
+        assert result.tracks[0].name == "Item1"
+        assert result.tracks[0].uri == "orfradio:oe1/20140914/1234567/1"
+        assert (
+            self.library.search({"artist": ["interp"]}, uris=["orfradio:fm4"]).tracks
+            == ()
+        )
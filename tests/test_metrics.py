@@ -0,0 +1,119 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+
+from mopidy_orfradio.metrics import Histogram, Metrics
+from mopidy_orfradio.web import MetricsHandler
+
+
+class HistogramTest(unittest.TestCase):
+    def test_quantile(self):
+        histogram = Histogram()
+        for value in [0.002] * 90 + [0.2] * 9 + [20]:
+            histogram.observe(value)
+
+        assert histogram.count == 100
+        assert histogram.quantile(0.5) == 0.005
+        assert histogram.quantile(0.95) == 0.25
+        assert histogram.quantile(1) is None
+
+    def test_quantile_empty(self):
+        assert Histogram().quantile(0.5) == 0
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_count(self):
+        self.metrics.count("cache_requests", endpoint="archive", result="hit")
+        self.metrics.count("cache_requests", result="hit", endpoint="archive")
+        self.metrics.count("received_bytes", 1024, endpoint="record")
+
+        assert self.metrics.snapshot()["counters"] == [
+            {
+                "name": "cache_requests",
+                "labels": {"endpoint": "archive", "result": "hit"},
+                "value": 2,
+            },
+            {"name": "received_bytes", "labels": {"endpoint": "record"}, "value": 1024},
+        ]
+
+    @patch("time.perf_counter", side_effect=[10, 10.003])
+    def test_timed(self, perf_counter):
+        @self.metrics.timed("call_seconds", call="browse")
+        def browse(uri):
+            return [uri]
+
+        assert browse("orfradio:") == ["orfradio:"]
+        (histogram,) = self.metrics.snapshot()["histograms"]
+        assert histogram["labels"] == {"call": "browse"}
+        assert histogram["count"] == 1
+        assert histogram["buckets"]["0.005"] == 1
+
+    def test_prometheus(self):
+        self.metrics.count("fetches", endpoint="archive", result="ok")
+        self.metrics.observe("fetch_seconds", 0.02, endpoint="archive")
+
+        lines = self.metrics.prometheus().splitlines()
+
+        assert "# TYPE orfradio_fetches_total counter" in lines
+        assert 'orfradio_fetches_total{endpoint="archive",result="ok"} 1' in lines
+        assert "# TYPE orfradio_fetch_seconds histogram" in lines
+        assert 'orfradio_fetch_seconds_bucket{endpoint="archive",le="0.01"} 0' in lines
+        assert 'orfradio_fetch_seconds_bucket{endpoint="archive",le="0.025"} 1' in lines
+        assert 'orfradio_fetch_seconds_bucket{endpoint="archive",le="+Inf"} 1' in lines
+        assert 'orfradio_fetch_seconds_count{endpoint="archive"} 1' in lines
+
+    def test_summary(self):
+        self.metrics.count("cache_requests", 3, endpoint="archive", result="hit")
+        self.metrics.count("cache_requests", endpoint="record", result="miss")
+        self.metrics.observe("fetch_seconds", 0.2, endpoint="record")
+        self.metrics.count("received_bytes", 2**20, endpoint="record")
+
+        assert self.metrics.summary() == (
+            "4 requests, 75% memory cache hits (3 hit, 1 miss), "
+            "1 fetches, p95 < 0.25s, 1.0 MiB received"
+        )
+
+    def test_summary_slow(self):
+        self.metrics.observe("fetch_seconds", 12, endpoint="record")
+
+        assert "1 fetches, p95 > 10s," in self.metrics.summary()
+
+
+class MetricsHandlerTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.metrics = Metrics()
+        self.metrics.count("fetches", endpoint="archive", result="ok")
+        return Application([("/metrics", MetricsHandler, {"metrics": self.metrics})])
+
+    def test_json(self):
+        response = self.fetch("/metrics")
+
+        assert response.code == 200
+        assert json.loads(response.body)["counters"][0]["value"] == 1
+
+    def test_json_slow(self):
+        self.metrics.observe("fetch_seconds", 12, endpoint="archive")
+
+        response = self.fetch("/metrics")
+
+        # Infinity, NaN and the like are not JSON.
+        body = json.loads(response.body, parse_constant=_reject)
+        assert body["histograms"][0]["p95"] is None
+
+    def test_prometheus(self):
+        response = self.fetch("/metrics?format=prometheus")
+
+        assert response.code == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert b"orfradio_fetches_total" in response.body
+
+
+def _reject(constant):
+    msg = f"Invalid JSON constant {constant}"
+    raise ValueError(msg)
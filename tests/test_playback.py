@@ -7,7 +7,7 @@ from mopidy_orfradio.playback import ORFLibraryUri, ORFPlaybackProvider, ORFUriT
 class ORFLibraryUriTest(unittest.TestCase):
     def test_playback_archive_item(self):
         library_uri = ORFLibraryUri(
-            ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "1234567"
+            ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "1234567", "1410674400000"
         )
         client_mock = Mock()
         client_mock.get_item_url = Mock(return_value="result_uri")
@@ -16,6 +16,64 @@ class ORFLibraryUriTest(unittest.TestCase):
         result = playback.translate_uri(str(library_uri))
 
         assert result == "result_uri"
+        client_mock.set_current_show.assert_called_once_with(
+            "oe1", "20140914", "1234567"
+        )
+
+    def test_playback_archive_item_with_stream(self):
+        library_uri = ORFLibraryUri(
+            ORFUriType.ARCHIVE_ITEM,
+            "oe1",
+            "20140914",
+            "1234567",
+            "1410674400000",
+            stream_id="a.mp3",
+            stream_start=1410674000000,
+        )
+        client_mock = Mock()
+        client_mock.get_stream_url = Mock(return_value="result_uri")
+        playback = ORFPlaybackProvider(None, None, client=client_mock)
+
+        result = playback.translate_uri(str(library_uri))
+
+        assert result == "result_uri"
+        client_mock.get_stream_url.assert_called_once_with(
+            "oe1", "1410674400000", 1410674000000, "a.mp3"
+        )
+        client_mock.get_item_url.assert_not_called()
+
+    def test_playback_archive_item_cached(self):
+        library_uri = ORFLibraryUri(
+            ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "1234567", "1410674400000"
+        )
+        client_mock = Mock()
+        client_mock.get_item_url = Mock(return_value="result_uri")
+        segments_mock = Mock()
+        segments_mock.get = Mock(return_value="file:///cache/audio/1.mp3")
+        playback = ORFPlaybackProvider(
+            None, None, client=client_mock, segments=segments_mock
+        )
+
+        result = playback.translate_uri(str(library_uri))
+
+        assert result == "file:///cache/audio/1.mp3"
+        segments_mock.get.assert_called_once_with("result_uri")
+
+    def test_playback_archive_item_not_cached(self):
+        library_uri = ORFLibraryUri(
+            ORFUriType.ARCHIVE_ITEM, "oe1", "20140914", "1234567", "1410674400000"
+        )
+        client_mock = Mock()
+        client_mock.get_item_url = Mock(return_value="result_uri")
+        segments_mock = Mock()
+        segments_mock.get = Mock(return_value=None)
+        playback = ORFPlaybackProvider(
+            None, None, client=client_mock, segments=segments_mock
+        )
+
+        result = playback.translate_uri(str(library_uri))
+
+        assert result == "result_uri"
 
     def test_playback_live(self):
         library_uri = ORFLibraryUri(ORFUriType.LIVE, "oe1")
@@ -0,0 +1,116 @@
+import datetime as dt
+import unittest
+from unittest.mock import Mock
+
+from mopidy_orfradio import TZ
+from mopidy_orfradio.client import Broadcast
+from mopidy_orfradio.prefetch import Lookahead, Prefetcher
+
+
+class PrefetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.client = Mock()
+        now = dt.datetime.now(tz=TZ)
+        self.client.get_day.return_value = [
+            Broadcast(id="1", start=now, time="01:00", title="Item1"),
+            Broadcast(id="2", start=now, time="02:00", title="Item2"),
+        ]
+        self.client.get_days.side_effect = lambda days: [
+            self.client.get_day(*day) for day in days
+        ]
+
+    def test_run(self):
+        prefetcher = Prefetcher(self.client, ["oe1", "fm4"], days=2, workers=2)
+
+        prefetcher.run()
+
+        today = dt.datetime.now(tz=TZ).date()
+        yesterday = today - dt.timedelta(days=1)
+        day_ids = [today.strftime("%Y%m%d"), yesterday.strftime("%Y%m%d")]
+        assert [c.args for c in self.client.get_day.call_args_list] == [
+            ("oe1", day_ids[0]),
+            ("oe1", day_ids[1]),
+            ("fm4", day_ids[0]),
+            ("fm4", day_ids[1]),
+        ]
+        assert self.client.get_show.call_count == 8
+        self.client.get_show.assert_any_call("fm4", day_ids[1], "2")
+
+    def test_run_listings_only(self):
+        prefetcher = Prefetcher(self.client, ["oe1", "fm4"], days=0, workers=2)
+
+        prefetcher.run()
+
+        today = dt.datetime.now(tz=TZ).strftime("%Y%m%d")
+        self.client.get_days.assert_called_once_with([("oe1", today), ("fm4", today)])
+        self.client.get_show.assert_not_called()
+
+    def test_failures_are_skipped(self):
+        self.client.get_day.side_effect = [[], self.client.get_day.return_value]
+        self.client.get_show.side_effect = [ValueError(), None]
+        prefetcher = Prefetcher(self.client, ["oe1"], days=2, workers=1)
+
+        prefetcher.run()
+
+        assert self.client.get_show.call_count == 2
+
+    def test_stop(self):
+        prefetcher = Prefetcher(self.client, ["oe1", "fm4"], days=8, workers=2)
+
+        prefetcher.stop()
+        prefetcher.run()
+
+        self.client.get_days.assert_not_called()
+        self.client.get_show.assert_not_called()
+
+
+class LookaheadTest(unittest.TestCase):
+    def setUp(self):
+        self.client = Mock()
+        self.lookahead = Lookahead(self.client, workers=2)
+
+    def test_submit(self):
+        self.lookahead.submit(
+            [
+                "orfradio:oe1/20140914/382176/1410674400000",
+                "orfradio:fm4/20140914/4UP/1410674500000?stream=a.mp3&start=0",
+                "orfradio:oe1/20140914/382176",
+                "orfradio:oe1/live",
+            ]
+        )
+        self.lookahead._executor.shutdown(wait=True)  # noqa: SLF001
+
+        self.client.get_item_url.assert_called_once_with(
+            "oe1", "oe1", "20140914", "382176", "1410674400000"
+        )
+
+    def test_failures_are_ignored(self):
+        self.client.get_item_url.side_effect = ValueError()
+
+        self.lookahead.submit(["orfradio:oe1/20140914/382176/1410674400000"])
+        self.lookahead._executor.shutdown(wait=True)  # noqa: SLF001
+
+        self.client.get_item_url.assert_called_once()
+
+    def test_submit_with_segments(self):
+        segments = Mock()
+        self.client.get_item_url.return_value = "item_url"
+        self.client.get_stream_url.return_value = "stream_url"
+        lookahead = Lookahead(self.client, workers=2, segments=segments)
+
+        lookahead.submit(
+            [
+                "orfradio:oe1/20140914/382176/1410674400000",
+                "orfradio:fm4/20140914/4UP/1410674500000?stream=a.mp3&start=0",
+                "orfradio:oe1/live",
+            ]
+        )
+        lookahead._executor.shutdown(wait=True)  # noqa: SLF001
+
+        self.client.get_stream_url.assert_called_once_with(
+            "fm4", "1410674500000", 0, "a.mp3"
+        )
+        assert sorted(call.args[0] for call in segments.fill.call_args_list) == [
+            "item_url",
+            "stream_url",
+        ]
@@ -0,0 +1,101 @@
+import unittest
+
+from mopidy.models import Album, Track
+
+from mopidy_orfradio.search import SearchIndex
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.update(
+            ("oe1", "20140914"),
+            [
+                (
+                    Album(uri="orfradio:oe1/20140914/1", name="Morgenjournal"),
+                    {"album": "Morgenjournal"},
+                )
+            ],
+        )
+        self.index.update(
+            ("oe1", "20140914", "1"),
+            [
+                (
+                    Track(uri="orfradio:oe1/20140914/1/1", name="Nachrichten"),
+                    {"track_name": "Nachrichten", "album": "Morgenjournal"},
+                ),
+                (
+                    Track(uri="orfradio:oe1/20140914/1/2", name="Air"),
+                    {"track_name": "Air", "artist": "Johann Sebastian Bach"},
+                ),
+            ],
+        )
+        self.index.update(
+            ("fm4", "20140914", "2"),
+            [
+                (
+                    Track(uri="orfradio:fm4/20140914/2/1", name="Song"),
+                    {"track_name": "Song", "artist": "Bachelor"},
+                )
+            ],
+        )
+
+    def _uris(self, query, uris=None, *, exact=False):
+        return [m.uri for m in self.index.search(query, uris, exact=exact)]
+
+    def test_search_field(self):
+        assert self._uris({"album": ["morgen"]}) == [
+            "orfradio:oe1/20140914/1",
+            "orfradio:oe1/20140914/1/1",
+        ]
+
+    def test_search_any(self):
+        assert self._uris({"any": ["bach"]}) == [
+            "orfradio:fm4/20140914/2/1",
+            "orfradio:oe1/20140914/1/2",
+        ]
+
+    def test_search_short_value(self):
+        assert self._uris({"track_name": ["ai"]}) == ["orfradio:oe1/20140914/1/2"]
+
+    def test_search_all_values_must_match(self):
+        assert self._uris({"artist": ["bach"], "track_name": ["air"]}) == [
+            "orfradio:oe1/20140914/1/2"
+        ]
+        assert self._uris({"artist": ["bach"], "track_name": ["song", "air"]}) == []
+
+    def test_search_exact(self):
+        assert self._uris({"artist": ["bach"]}, exact=True) == []
+        assert self._uris({"artist": ["Johann Sebastian Bach"]}, exact=True) == [
+            "orfradio:oe1/20140914/1/2"
+        ]
+
+    def test_search_uris(self):
+        assert self._uris({"any": ["bach"]}, ["orfradio:fm4"]) == [
+            "orfradio:fm4/20140914/2/1"
+        ]
+
+    def test_search_unsupported_field(self):
+        assert self._uris({"date": ["2014"]}) == []
+
+    def test_search_empty_query(self):
+        assert self._uris({}) == []
+
+    def test_update_replaces_group(self):
+        self.index.update(
+            ("oe1", "20140914", "1"),
+            [
+                (
+                    Track(uri="orfradio:oe1/20140914/1/3", name="Wetter"),
+                    {"track_name": "Wetter"},
+                )
+            ],
+        )
+        assert self._uris({"track_name": ["air"]}) == []
+        assert self._uris({"track_name": ["wetter"]}) == ["orfradio:oe1/20140914/1/3"]
+        assert len(self.index) == 3
+
+    def test_remove(self):
+        self.index.remove(lambda group: group[0] == "oe1")
+        assert self._uris({"any": ["bach"]}) == ["orfradio:fm4/20140914/2/1"]
+        assert len(self.index) == 1
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from mopidy_orfradio.segments import SegmentCache
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        body = self.server.segments.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+class SegmentCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.requests = []
+        self.server.segments = {
+            "/a.mp3": b"a" * 1000,
+            "/b.mp3": b"b" * 1000,
+            "/c.mp3": b"c" * 1000,
+            "/large.mp3": b"x" * 5000,
+        }
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+        self.cache = SegmentCache(self.path, max_size=2500, max_age=3600)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def url(self, name):
+        return f"{self.base_url}/{name}"
+
+    def test_fill_and_get(self):
+        assert self.cache.get(self.url("a.mp3")) is None
+
+        self.cache.fill(self.url("a.mp3"))
+        uri = self.cache.get(self.url("a.mp3"))
+
+        assert uri.startswith("file://")
+        assert Path(uri.removeprefix("file://")).read_bytes() == b"a" * 1000
+
+    def test_fill_cached(self):
+        self.cache.fill(self.url("a.mp3"))
+        self.cache.fill(self.url("a.mp3"))
+
+        assert self.server.requests == ["/a.mp3"]
+
+    def test_fill_failed(self):
+        self.cache.fill(self.url("missing.mp3"))
+
+        assert self.cache.get(self.url("missing.mp3")) is None
+        assert list(self.path.iterdir()) == []
+
+    def test_fill_too_large(self):
+        self.cache.fill(self.url("large.mp3"))
+
+        assert self.cache.get(self.url("large.mp3")) is None
+        assert list(self.path.iterdir()) == []
+
+    def test_get_expired(self):
+        self.cache.fill(self.url("a.mp3"))
+        (path,) = self.path.iterdir()
+        past = time.time() - 7200
+        os.utime(path, (past, past))
+
+        assert self.cache.get(self.url("a.mp3")) is None
+        assert not path.exists()
+
+    def test_least_recently_played_evicted(self):
+        self.cache.fill(self.url("a.mp3"))
+        self.cache.fill(self.url("b.mp3"))
+        for i, path in enumerate(sorted(self.path.iterdir(), key=os.path.getmtime)):
+            past = time.time() - 100 + i
+            os.utime(path, (past, past))
+        self.cache.get(self.url("a.mp3"))
+
+        self.cache.fill(self.url("c.mp3"))
+
+        assert self.cache.get(self.url("a.mp3")) is not None
+        assert self.cache.get(self.url("b.mp3")) is None
+        assert self.cache.get(self.url("c.mp3")) is not None
@@ -0,0 +1,205 @@
+import gzip
+import threading
+import time
+import unittest
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from mopidy_orfradio.transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HttpTransport,
+    decompress,
+)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address[1]))
+        server.accept_encodings.append(self.headers.get("Accept-Encoding"))
+        if self.path == "/slow":
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(0.05)
+            with server.lock:
+                server.active -= 1
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+class HttpTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.requests = []
+        self.server.accept_encodings = []
+        self.server.statuses = []
+        self.server.lock = threading.Lock()
+        self.server.active = self.server.max_active = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.transport = HttpTransport(backoff=0, proxy=None)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get(self):
+        response = self.transport.get(f"{self.base_url}/oe1/json/2.0/broadcasts/")
+
+        assert response.status == 200
+        assert response.content == b'{"ok": true}'
+        assert response.encoding == "utf-8"
+        assert self.server.requests[0][0] == "/oe1/json/2.0/broadcasts/"
+
+    def test_compression_requested(self):
+        self.transport.get(f"{self.base_url}/a")
+        transport = HttpTransport(compress=False, proxy=None)
+        transport.get(f"{self.base_url}/b")
+        transport.close()
+
+        assert self.server.accept_encodings == ["gzip, deflate", "identity"]
+
+    def test_connection_reused(self):
+        self.transport.get(f"{self.base_url}/a")
+        self.transport.get(f"{self.base_url}/b?c=d")
+
+        (_, port_a), (path_b, port_b) = self.server.requests
+        assert path_b == "/b?c=d"
+        assert port_a == port_b
+
+    def test_retry_on_server_error(self):
+        self.server.statuses = [503, 503]
+
+        response = self.transport.get(f"{self.base_url}/a")
+
+        assert response.status == 200
+        assert len(self.server.requests) == 3
+
+    def test_retries_are_bounded(self):
+        self.server.statuses = [503, 503, 503]
+
+        response = self.transport.get(f"{self.base_url}/a")
+
+        assert response.status == 503
+        assert len(self.server.requests) == 3
+
+    def test_concurrency_limit(self):
+        transport = HttpTransport(max_connections=2, proxy=None)
+        threads = [
+            threading.Thread(target=transport.get, args=(f"{self.base_url}/slow",))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        transport.close()
+
+        assert len(self.server.requests) == 6
+        assert self.server.max_active == 2
+
+    def test_proxy_without_host(self):
+        transport = HttpTransport(proxy="http://:3128")
+
+        with self.assertLogs("mopidy_orfradio.transport", "WARNING"):
+            response = transport.get(f"{self.base_url}/a")
+        transport.close()
+
+        assert response.status == 200
+        assert self.server.requests
+
+    def test_connection_error(self):
+        self.server.shutdown()
+        self.server.server_close()
+        transport = HttpTransport(backoff=0, retries=1, connect_timeout=1)
+
+        with self.assertRaises(OSError):  # noqa: PT027
+            transport.get(f"{self.base_url}/a")
+
+    def test_circuit_breaker(self):
+        transport = HttpTransport(
+            backoff=0, retries=0, breaker_threshold=2, breaker_cooldown=60
+        )
+        self.server.statuses = [500, 404, 503, 500]
+
+        assert transport.get(f"{self.base_url}/a").status == 500
+        assert transport.get(f"{self.base_url}/a").status == 404
+        assert transport.get(f"{self.base_url}/a").status == 503
+        assert transport.get(f"{self.base_url}/a").status == 500
+        with pytest.raises(CircuitOpenError):
+            transport.get(f"{self.base_url}/a")
+
+        assert len(self.server.requests) == 4
+        transport.close()
+
+
+class DecompressTest(unittest.TestCase):
+    content = b'{"ok": true}' * 10
+
+    def test_identity(self):
+        assert decompress(self.content, None) is self.content
+        assert decompress(self.content, "identity") is self.content
+
+    def test_gzip(self):
+        assert decompress(gzip.compress(self.content), "gzip") == self.content
+
+    def test_deflate(self):
+        assert decompress(zlib.compress(self.content), "deflate") == self.content
+        raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        data = raw.compress(self.content) + raw.flush()
+        assert decompress(data, "Deflate") == self.content
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="Unsupported"):
+            decompress(self.content, "br")
+        with pytest.raises(ValueError, match="Invalid gzip"):
+            decompress(self.content, "gzip")
+        with pytest.raises(ValueError, match="Truncated gzip"):
+            decompress(gzip.compress(self.content)[:-10], "gzip")
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    @patch("time.monotonic")
+    def test_cooldown(self, monotonic):
+        monotonic.return_value = 1000
+        breaker = CircuitBreaker(threshold=2, cooldown=10)
+        breaker.failure()
+        assert breaker.allow()
+        breaker.failure()
+        assert not breaker.allow()
+        assert breaker.retry_after == 10
+
+        monotonic.return_value = 1010
+        assert breaker.allow()
+        assert not breaker.allow()  # Only one trial request at a time.
+        breaker.failure()
+        assert breaker.retry_after == 20
+
+        monotonic.return_value = 1030
+        assert breaker.allow()
+        breaker.success()
+        assert breaker.allow()
+        assert breaker.allow()
+
+    def test_max_cooldown(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=10, max_cooldown=30)
+        for _ in range(5):
+            breaker.failure()
+        assert 29 < breaker.retry_after <= 30